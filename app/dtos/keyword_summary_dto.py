@@ -3,4 +3,8 @@ from typing import List
 
 class KeywordSummaryResult(BaseModel):
     summary: str
-    keywords: List[str]
\ No newline at end of file
+    keywords: List[str]
+
+class MeetingAnalysisResult(KeywordSummaryResult):
+    # 회의록 영어 번역 (TF-IDF 코사인 유사도 계산용)
+    translation: str
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+class PdfExtractionResult(BaseModel):
+    text: str
+    pages_parsed: int
+    total_pages: int
+    elapsed: float                  # 추출 소요 시간 (초)
+    stopped_at_references: bool = False
+    parallel: bool = False
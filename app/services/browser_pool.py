@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import atexit
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+# ───── 상수
+_BASE_DOWNLOAD_DIR  = os.path.abspath(os.getenv("SELENIUM_DOWNLOAD_DIR", "./selenium_downloads"))
+_MAX_BROWSERS       = int(os.getenv("BROWSER_POOL_SIZE", 2))          # 프로세스당 동시 브라우저 수
+_MAX_USES           = int(os.getenv("BROWSER_MAX_USES", 20))          # 세션 재사용 횟수 (초과 시 재생성)
+_DOWNLOAD_TIMEOUT   = int(os.getenv("BROWSER_DOWNLOAD_TIMEOUT", 15))  # 다운로드 완료 대기 (초)
+_PARTIAL_SUFFIXES   = (".crdownload", ".tmp")
+
+logger = logging.getLogger(__name__)
+
+
+class _PdfDownloadHandler(FileSystemEventHandler):
+    """
+    다운로드 디렉토리의 .pdf 파일이 생성/변경/rename되면 이벤트 설정.
+    Chrome은 .crdownload → .pdf rename 전에 0바이트 .pdf를 먼저 만들기 때문에
+    이벤트는 "다시 확인하라"는 신호로만 쓰고, 완료 여부는 BrowserSession._completed_pdf()로 판단한다.
+    """
+
+    def __init__(self):
+        self.changed = threading.Event()
+
+    def _check(self, path: str) -> None:
+        if path.lower().endswith(".pdf"):
+            self.changed.set()
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self._check(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self._check(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self._check(event.dest_path)
+
+
+class BrowserSession:
+    """헤드리스 Chrome 1개 + 전용 다운로드 디렉토리"""
+
+    def __init__(self, base_dir: str):
+        os.makedirs(base_dir, exist_ok=True)
+        self.download_dir = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=base_dir)
+        self.uses = 0
+        self.broken = False
+
+        chrome_options = Options()
+        chrome_options.add_experimental_option("prefs", {
+            "download.default_directory": self.download_dir,
+            "download.prompt_for_download": False,
+            "plugins.always_open_pdf_externally": True
+        })
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        self.driver = webdriver.Chrome(options=chrome_options)
+        # headless 모드에서도 PDF를 뷰어 대신 파일로 내려받도록 설정
+        self.driver.execute_cdp_cmd("Page.setDownloadBehavior", {
+            "behavior": "allow",
+            "downloadPath": self.download_dir,
+        })
+
+    def _clear_downloads(self) -> None:
+        for path in glob.glob(os.path.join(self.download_dir, "*")):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _completed_pdf(self) -> Optional[str]:
+        """내용이 있고 진행 중인 부분 파일(.crdownload 등)이 남아 있지 않은 .pdf"""
+        pdf_files = [
+            p for p in glob.glob(os.path.join(self.download_dir, "*.pdf"))
+            if os.path.getsize(p) > 0 and not any(os.path.exists(p + suffix) for suffix in _PARTIAL_SUFFIXES)
+        ]
+        return pdf_files[0] if pdf_files else None
+
+    def download(self, url: str, timeout: int = _DOWNLOAD_TIMEOUT) -> Optional[str]:
+        """
+        url을 열어 PDF를 전용 디렉토리에 내려받고 파일 경로 반환 (실패 시 None).
+        고정 sleep 대신 파일 시스템 이벤트로 완료를 감지한다.
+        """
+        self.uses += 1
+        self._clear_downloads()
+        handler = _PdfDownloadHandler()
+        observer = Observer()
+        observer.schedule(handler, self.download_dir, recursive=False)
+        observer.start()
+        try:
+            self.driver.get(url)
+            deadline = time.monotonic() + timeout
+            while True:
+                # 확인 전에 이벤트를 지워야 확인과 대기 사이의 변경을 놓치지 않음
+                handler.changed.clear()
+                path = self._completed_pdf()
+                remaining = deadline - time.monotonic()
+                if path is not None:
+                    return path
+                if remaining <= 0:
+                    # 다운로드가 Chrome에서 계속 진행돼 다음 호출의 디렉토리에 늦게 완성될 수 있으므로
+                    # 이 세션은 풀에 돌려놓지 않고 재생성한다 (다른 논문의 PDF로 잘못 반환되는 것 방지)
+                    logger.warning(f"[BrowserPool] 다운로드 {timeout}초 초과 → 세션 폐기: {url}")
+                    self.broken = True
+                    return None
+                handler.changed.wait(remaining)
+        except Exception:
+            self.broken = True
+            raise
+        finally:
+            observer.stop()
+            observer.join()
+
+    def close(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.error(f"[BrowserPool] 브라우저 종료 실패: {e}")
+        shutil.rmtree(self.download_dir, ignore_errors=True)
+
+
+class BrowserPool:
+    """
+    워커 프로세스 단위의 헤드리스 브라우저 풀.
+    동시에 실행되는 브라우저 수를 제한하고, N회 사용한 세션은 종료 후 새로 만든다.
+    """
+
+    def __init__(self, max_browsers: int = _MAX_BROWSERS, max_uses: int = _MAX_USES,
+                 base_dir: str = _BASE_DOWNLOAD_DIR):
+        self.max_uses = max_uses
+        self.base_dir = base_dir
+        self._slots = threading.BoundedSemaphore(max_browsers)
+        self._idle: List[BrowserSession] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self):
+        self._slots.acquire()
+        session = None
+        try:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                session = BrowserSession(self.base_dir)
+                logger.info(f"[BrowserPool] 새 브라우저 세션 생성: {session.download_dir}")
+            yield session
+        finally:
+            if session is not None:
+                self._release(session)
+            self._slots.release()
+
+    def _release(self, session: BrowserSession) -> None:
+        if session.broken or session.uses >= self.max_uses:
+            logger.info(f"[BrowserPool] 브라우저 세션 재생성 (사용 {session.uses}회, 오류={session.broken})")
+            session.close()
+            return
+        session._clear_downloads()
+        with self._lock:
+            self._idle.append(session)
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            session.close()
+
+
+_pool: Optional[BrowserPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """현재 프로세스의 브라우저 풀 (fork된 워커 프로세스마다 별도로 생성)"""
+    global _pool, _pool_pid
+    with _pool_lock:
+        if _pool is None or _pool_pid != os.getpid():
+            _pool = BrowserPool()
+            _pool_pid = os.getpid()
+        return _pool
+
+
+@atexit.register
+def _close_pool() -> None:
+    if _pool is not None and _pool_pid == os.getpid():
+        _pool.close()
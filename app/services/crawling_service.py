@@ -1,104 +1,235 @@
 from app.dtos.paperItem_dto import PaperItem
 from app.dtos.crawled_paper_dto import CrawledPaper
-from typing import List, Optional
+from app.services import host_health, pdf_text_cache
+from app.services.browser_pool import get_browser_pool
+from app.services.http_pool import create_session, HostLimiter
+from app.services.pdf_extraction import extract_text_offloaded
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Optional, Union
 import requests
-import PyPDF2
 import logging
+import io
 import os
+import threading
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-import glob
 
 logger = logging.getLogger(__name__)
 
+# PDF 다운로드 최대 크기 (초과 시 중단)
+_MAX_PDF_BYTES = int(os.getenv('PDF_MAX_BYTES', 50 * 1024 * 1024))
+_CHUNK_SIZE = 64 * 1024
+_PDF_MAGIC = b'%PDF-'
+# 매직 바이트를 찾을 첫 청크 범위 (앞에 공백/BOM이 붙는 서버 대비)
+_MAGIC_SEARCH_BYTES = 1024
+
+# 배치 크롤링 동시성 (전체 상한 + 호스트별 상한), 논문 1건당 마감 시간(호스트 슬롯을 얻은 시점부터)과 배치 전체 마감 시간
+_CRAWL_PARALLEL = os.getenv('CRAWL_PARALLEL', 'true').lower() == 'true'
+_CRAWL_WORKERS = int(os.getenv('CRAWL_WORKERS', 8))
+_CRAWL_PER_HOST = int(os.getenv('CRAWL_PER_HOST', 2))
+_CRAWL_HOST_LIMITS = {
+    'arxiv.org': int(os.getenv('CRAWL_LIMIT_ARXIV', 4)),
+    'ieeexplore.ieee.org': int(os.getenv('CRAWL_LIMIT_IEEE', 1)),
+    'ojs.aaai.org': int(os.getenv('CRAWL_LIMIT_AAAI', 2)),
+}
+_PAPER_DEADLINE = float(os.getenv('CRAWL_PAPER_DEADLINE', 60))
+_BATCH_DEADLINE = float(os.getenv('CRAWL_BATCH_DEADLINE', 240))
+_REQUEST_TIMEOUT = 30
+
+# 프로세스 내 CrawlingService 인스턴스가 커넥션 풀과 호스트별 제한을 공유
+_session = create_session(pool_size=_CRAWL_WORKERS)
+_host_limiter = HostLimiter(_CRAWL_PER_HOST, _CRAWL_HOST_LIMITS)
+_crawl_executor = ThreadPoolExecutor(max_workers=_CRAWL_WORKERS)
+
+
+class _Deadline:
+    """
+    논문 1건의 마감 시간. 배치 제출 시점이 아니라 호스트 슬롯(또는 브라우저)을 얻은 시점부터 잰다.
+    대기 중인 쪽에서 cancel()하면 아직 시작하지 않은 논문은 슬롯을 얻어도 다운로드하지 않는다.
+    """
+
+    def __init__(self, seconds: float = _PAPER_DEADLINE):
+        self.seconds = seconds
+        self.at: Optional[float] = None
+        self.cancelled = False
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """슬롯을 얻었을 때 호출, 이미 취소됐으면 False (여러 번 호출해도 처음 시점 유지)"""
+        with self._lock:
+            if self.cancelled:
+                return False
+            if self.at is None:
+                self.at = time.monotonic() + self.seconds
+            return True
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+
+    def remaining(self) -> float:
+        if self.at is None:
+            return self.seconds
+        return max(self.at - time.monotonic(), 0)
+
+    def expired(self) -> bool:
+        return self.cancelled or (self.at is not None and time.monotonic() >= self.at)
+
+
 class CrawlingService:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        self.download_dir = os.path.abspath("./selenium_downloads")
-        os.makedirs(self.download_dir, exist_ok=True)
-
-    def _parse_pdf(self, pdf_path: str) -> Optional[str]:
+        self.session = _session
+
+    def _parse_pdf(self, source: Union[str, io.BytesIO]) -> Optional[str]:
+        """PDF 파일 경로 또는 메모리 버퍼에서 텍스트 추출 (앞부분/참고문헌 전까지, 프로세스 풀에서 실행)"""
         try:
-            with open(pdf_path, "rb") as f:
-                pdf_reader = PyPDF2.PdfReader(f)
-                text_content = []
-                for page in pdf_reader.pages:
-                    text = page.extract_text()
-                    if text:
-                        text_content.append(text)
-                return '\n'.join(text_content)
+            return extract_text_offloaded(source).text
         except Exception as e:
             logger.error(f"PDF 파싱 실패: {str(e)}")
             return None
 
-    def crawl_paper_texts(self, papers: List[PaperItem]) -> List[CrawledPaper]:
-        logger.info(f"총 {len(papers)}개의 논문 크롤링 시작")
-        crawled_papers = []
-        for i, paper in enumerate(papers, 1):
-            logger.warning(f"[{i}/{len(papers)}] 논문 '{paper.title}' 처리 시작")
-            text_content = None
-            pdf_path = os.path.join(self.download_dir, 'downloaded_paper.pdf')
-            # 기존 파일 삭제
-            if os.path.exists(pdf_path):
-                os.remove(pdf_path)
-            # 1. requests로 PDF 다운로드 시도
+    def _download_pdf(self, url: str, timeout: float = _REQUEST_TIMEOUT,
+                      deadline: Optional[_Deadline] = None) -> Optional[io.BytesIO]:
+        """
+        PDF를 스트리밍으로 메모리에 다운로드 (호스트별 동시 다운로드 수 제한).
+        Content-Type이 텍스트(HTML 등)이거나, 첫 청크에 PDF 매직 바이트가 없거나,
+        크기 상한을 넘으면 본문을 더 받지 않고 None 반환.
+        HTTP 에러(403 등)는 호출부에서 처리하도록 그대로 raise.
+        deadline이 주어지면 호스트 슬롯을 얻은 시점부터 마감 시간을 재고, 슬롯을 기다리는 동안 취소됐으면 요청하지 않는다.
+        응답 시간과 결과는 호스트 상태 레지스트리에 기록한다.
+        """
+        with _host_limiter.limit(url):
+            if deadline is not None:
+                if not deadline.start():
+                    return None
+                timeout = min(timeout, max(deadline.remaining(), 1))
+            started = time.monotonic()
+            status_code, error = None, True
             try:
-                logger.warning(f"논문 '{paper.title}' PDF 직접 다운로드 시도: {paper.pdf_url}")
-                response = self.session.get(paper.pdf_url, timeout=30)
-                response.raise_for_status()
-                with open(pdf_path, "wb") as f:
-                    f.write(response.content)
-                logger.warning(f"논문 '{paper.title}' PDF 직접 다운로드 성공")
-                text_content = self._parse_pdf(pdf_path)
+                pdf_buffer = self._stream_pdf(url, timeout)
+                error = pdf_buffer is None
+                return pdf_buffer
             except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 403:
-                    logger.warning(f"논문 '{paper.title}' 403 에러 발생, 셀레니움 다운로드 시도")
-                    # 2. 셀레니움+pyautogui로 PDF 저장
-                    chrome_options = Options()
-                    chrome_options.add_experimental_option("prefs", {
-                        "download.default_directory": self.download_dir,
-                        "download.prompt_for_download": False,
-                        "plugins.always_open_pdf_externally": True
-                    })
-                    # chrome_options.add_argument("--headless")  # headless 사용 금지
-                    chrome_options.add_argument("--no-sandbox")
-                    chrome_options.add_argument("--disable-dev-shm-usage")
-                    driver = webdriver.Chrome(options=chrome_options)
-                    try:
-                        driver.get(paper.pdf_url)
-                        time.sleep(5)  # 페이지 로딩 대기
-                        # 다운로드 완료 대기
-                        wait_time = 0
-                        latest_pdf_path = None
-
-                        while wait_time < 10:
-                            latest_pdf_path = self._find_latest_pdf()
-                            if latest_pdf_path and os.path.getsize(latest_pdf_path) > 0:
-                                break
-                            time.sleep(1)
-                            wait_time += 1
-                        latest_pdf_path = self._find_latest_pdf()
-                        if latest_pdf_path and os.path.getsize(latest_pdf_path) > 0:
-                            logger.warning(f"논문 '{paper.title}' PDF 셀레니움 다운로드 성공: {latest_pdf_path}")
-                            text_content = self._parse_pdf(latest_pdf_path)
-                            os.remove(latest_pdf_path)
-                        else:
-                            logger.error(f"논문 '{paper.title}' PDF 셀레니움 다운로드 실패: 파일 없음 또는 크기 0")
-                    except Exception as se:
-                        logger.error(f"논문 '{paper.title}' 셀레니움 다운로드 중 예외: {str(se)}")
-                    finally:
-                        driver.quit()
+                status_code = e.response.status_code
+                error = status_code >= 500 or status_code == 429
+                raise
+            finally:
+                host_health.record(url, time.monotonic() - started, status_code, error)
+
+    def _stream_pdf(self, url: str, timeout: float) -> Optional[io.BytesIO]:
+        with self.session.get(url, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+
+            content_type = response.headers.get('Content-Type', '').lower()
+            if content_type.startswith('text/'):
+                logger.warning(f"PDF가 아닌 응답 (Content-Type: {content_type}): {url}")
+                return None
+
+            content_length = int(response.headers.get('Content-Length') or 0)
+            if content_length > _MAX_PDF_BYTES:
+                logger.warning(f"PDF 크기 상한 초과 ({content_length} bytes): {url}")
+                return None
+
+            buffer = io.BytesIO()
+            for chunk in response.iter_content(chunk_size=_CHUNK_SIZE):
+                if buffer.tell() == 0 and _PDF_MAGIC not in chunk[:_MAGIC_SEARCH_BYTES]:
+                    logger.warning(f"PDF 매직 바이트 없음: {url}")
+                    return None
+                buffer.write(chunk)
+                if buffer.tell() > _MAX_PDF_BYTES:
+                    logger.warning(f"PDF 크기 상한 초과 (다운로드 중 {buffer.tell()} bytes): {url}")
+                    return None
+            buffer.seek(0)
+            return buffer
+
+    def _download_with_selenium(self, paper: PaperItem, deadline: Optional[_Deadline] = None) -> Optional[str]:
+        """403 응답 시 풀의 헤드리스 브라우저로 PDF를 저장한 뒤 텍스트 추출"""
+        text_content = None
+        try:
+            with get_browser_pool().session() as browser:
+                # 브라우저를 기다리는 동안 취소됐으면 다운로드하지 않음
+                if deadline is not None and not deadline.start():
+                    return None
+                pdf_path = browser.download(paper.pdf_url)
+                if pdf_path:
+                    logger.warning(f"논문 '{paper.title}' PDF 셀레니움 다운로드 성공: {pdf_path}")
+                    text_content = self._parse_pdf(pdf_path)
                 else:
-                    logger.error(f"논문 '{paper.title}' PDF 다운로드 실패: {str(e)}")
-            except Exception as e:
-                logger.error(f"논문 '{paper.title}' PDF 다운로드 중 예외: {str(e)}")
-            # 파일 정리
-            if os.path.exists(pdf_path):
-                os.remove(pdf_path)
+                    logger.error(f"논문 '{paper.title}' PDF 셀레니움 다운로드 실패: 파일 없음 또는 크기 0")
+        except Exception as se:
+            logger.error(f"논문 '{paper.title}' 셀레니움 다운로드 중 예외: {str(se)}")
+        return text_content
+
+    def _crawl_text(self, paper: PaperItem, deadline: Optional[_Deadline] = None) -> Optional[str]:
+        """
+        논문 1건의 PDF 본문 텍스트 (텍스트 캐시 → 직접 다운로드 → 403이면 셀레니움).
+        deadline이 주어지면 호스트 슬롯을 얻은 뒤 남은 시간만큼만 다운로드를 기다린다.
+        """
+        # 0. 이전 회의에서 추출한 텍스트가 있으면 다운로드/파싱 생략
+        text_content = pdf_text_cache.get_by_url(paper.pdf_url)
+        if text_content is not None:
+            logger.warning(f"논문 '{paper.title}' 텍스트 캐시 적중")
+            return text_content
+
+        # 계속 실패 중인 호스트는 워커 시간을 쓰지 않고 건너뜀
+        if not host_health.allow_request(paper.pdf_url):
+            logger.warning(f"논문 '{paper.title}' 호스트 차단 중 → 다운로드 생략: {paper.pdf_url}")
+            return None
+        # 직접 요청에 대부분 403을 반환하는 호스트는 바로 브라우저 다운로드
+        if host_health.prefers_browser(paper.pdf_url):
+            logger.warning(f"논문 '{paper.title}' 403 빈발 호스트 → 셀레니움 다운로드")
+            return self._crawl_with_browser(paper, deadline)
+
+        # 1. requests로 PDF 다운로드 시도 (메모리 버퍼로 스트리밍, 디스크 기록 없음)
+        try:
+            logger.warning(f"논문 '{paper.title}' PDF 직접 다운로드 시도: {paper.pdf_url}")
+            pdf_buffer = self._download_pdf(paper.pdf_url, _REQUEST_TIMEOUT, deadline)
+            if pdf_buffer is not None:
+                logger.warning(f"논문 '{paper.title}' PDF 직접 다운로드 성공 ({pdf_buffer.getbuffer().nbytes} bytes)")
+                # URL은 달라도 내용이 같은 PDF면 파싱 생략
+                key = pdf_text_cache.content_key(pdf_buffer.getbuffer())
+                text_content = pdf_text_cache.get_by_content(key)
+                if text_content is None:
+                    text_content = self._parse_pdf(pdf_buffer)
+                else:
+                    logger.warning(f"논문 '{paper.title}' 동일 PDF 텍스트 캐시 적중")
+                pdf_text_cache.put(paper.pdf_url, text_content, key)
+        except requests.exceptions.HTTPError as e:
+            if e.response.status_code == 403:
+                logger.warning(f"논문 '{paper.title}' 403 에러 발생, 셀레니움 다운로드 시도")
+                # 2. 셀레니움으로 PDF 저장
+                text_content = self._crawl_with_browser(paper, deadline)
+            else:
+                logger.error(f"논문 '{paper.title}' PDF 다운로드 실패: {str(e)}")
+        except Exception as e:
+            logger.error(f"논문 '{paper.title}' PDF 다운로드 중 예외: {str(e)}")
+        return text_content
+
+    def _crawl_with_browser(self, paper: PaperItem, deadline: Optional[_Deadline] = None) -> Optional[str]:
+        """셀레니움 다운로드 후 텍스트 캐시에 저장 (마감 시간이 지났거나 취소됐으면 생략)"""
+        if deadline is not None and deadline.expired():
+            logger.warning(f"논문 '{paper.title}' 마감 시간 초과로 셀레니움 생략")
+            return None
+        text_content = self._download_with_selenium(paper, deadline)
+        pdf_text_cache.put(paper.pdf_url, text_content)
+        return text_content
+
+    def crawl_paper_texts(self, papers: List[PaperItem], parallel: bool = _CRAWL_PARALLEL) -> List[CrawledPaper]:
+        """
+        논문 목록의 본문 텍스트를 입력 순서대로 반환.
+        parallel이면 스레드 풀에서 동시에 다운로드하고(전체/호스트별 동시성 제한),
+        호스트 슬롯을 얻은 뒤 _PAPER_DEADLINE 안에 끝나지 않았거나 _BATCH_DEADLINE까지 시작하지 못한 논문은 빈 텍스트로 처리한다.
+        """
+        logger.info(f"총 {len(papers)}개의 논문 크롤링 시작 (병렬={parallel})")
+        if parallel:
+            texts = self._crawl_texts_parallel(papers)
+        else:
+            texts = []
+            for i, paper in enumerate(papers, 1):
+                logger.warning(f"[{i}/{len(papers)}] 논문 '{paper.title}' 처리 시작")
+                texts.append(self._crawl_text(paper))
+
+        crawled_papers = []
+        for i, (paper, text_content) in enumerate(zip(papers, texts), 1):
             # CrawledPaper 생성
             crawled_paper = CrawledPaper(
                 paper_id=paper.paper_id,
@@ -110,89 +241,52 @@ class CrawlingService:
             logger.info(f"[{i}/{len(papers)}] 논문 '{paper.title}' 처리 완료 (텍스트 길이: {len(text_content) if text_content else 0})")
             print(f"[DEBUG] {crawled_paper.title} | 텍스트 길이: {len(crawled_paper.text_content) if crawled_paper.text_content else 0}")
             print(f"[DEBUG] 일부 텍스트: {crawled_paper.text_content[:200] if crawled_paper.text_content else 'None'}")
-        logger.info(f"크롤링 완료: 총 {len(crawled_papers)}/{len(papers)}개 논문 성공")
+        logger.info(f"크롤링 완료: 총 {sum(1 for p in crawled_papers if p.text_content)}/{len(papers)}개 논문 성공")
         return crawled_papers
 
-    def _find_latest_pdf(self) -> Optional[str]:
-        pdf_files = glob.glob(os.path.join(self.download_dir, '*.pdf'))
-        if not pdf_files:
-            return None
-        latest_pdf = max(pdf_files, key=os.path.getctime)
-        return latest_pdf
+    def _crawl_texts_parallel(self, papers: List[PaperItem]) -> List[Optional[str]]:
+        """
+        스레드 풀에서 논문별 _crawl_text 실행.
+        논문마다 호스트 슬롯을 얻은 시점부터 _PAPER_DEADLINE을 재므로, 느린 호스트 뒤에서 기다린 시간은 포함되지 않는다.
+        마감이 지난 논문과 배치 마감(_BATCH_DEADLINE)까지 시작하지 못한 논문은 취소하고 더 기다리지 않는다
+        (이미 실행 중인 다운로드는 남은 요청 타임아웃 안에 끝나며, 완료되면 텍스트 캐시에는 남음).
+        """
+        started = time.monotonic()
+        batch_deadline = started + _BATCH_DEADLINE
+        deadlines = [_Deadline() for _ in papers]
+        futures = [_crawl_executor.submit(self._crawl_text, paper, deadline)
+                   for paper, deadline in zip(papers, deadlines)]
+        texts: List[Optional[str]] = [None] * len(papers)
+        pending = set(range(len(papers)))
+        while pending:
+            # 아직 시작하지 않은 논문이 언제 슬롯을 얻을지 모르므로 최대 1초 간격으로 다시 확인
+            timeout = min([1.0, max(batch_deadline - time.monotonic(), 0)]
+                          + [deadlines[i].remaining() for i in pending if deadlines[i].at is not None])
+            done, _ = wait([futures[i] for i in pending], timeout=timeout, return_when=FIRST_COMPLETED)
+            for i in list(pending):
+                paper, future, deadline = papers[i], futures[i], deadlines[i]
+                if future in done:
+                    pending.discard(i)
+                    try:
+                        texts[i] = future.result()
+                    except Exception as e:
+                        logger.error(f"논문 '{paper.title}' 크롤링 중 예외: {str(e)}")
+                elif deadline.expired():
+                    pending.discard(i)
+                    deadline.cancel()
+                    logger.error(f"논문 '{paper.title}' 크롤링 마감 시간({_PAPER_DEADLINE}초) 초과")
+                elif time.monotonic() >= batch_deadline:
+                    pending.discard(i)
+                    deadline.cancel()
+                    future.cancel()
+                    logger.error(f"논문 '{paper.title}' 배치 마감 시간({_BATCH_DEADLINE}초)까지 "
+                                 f"{'완료하지' if deadline.at is not None else '시작하지'} 못함")
+        logger.info(f"병렬 크롤링 {len(papers)}건: {time.monotonic() - started:.2f}초")
+        return texts
 
     def crawl_single_paper_text(self, paper: PaperItem) -> CrawledPaper:
         logger.info(f"단일 논문 크롤링 시작: {paper.title}")
-        text_content = None
-        pdf_path = os.path.join(self.download_dir, 'downloaded_paper.pdf')
-        # 기존 파일 삭제
-        if os.path.exists(pdf_path):
-            os.remove(pdf_path)
-        # 1. requests로 PDF 다운로드 시도
-        try:
-            logger.warning(f"논문 '{paper.title}' PDF 직접 다운로드 시도: {paper.pdf_url}")
-            response = self.session.get(paper.pdf_url, timeout=30)
-            response.raise_for_status()
-            with open(pdf_path, "wb") as f:
-                f.write(response.content)
-            logger.warning(f"논문 '{paper.title}' PDF 직접 다운로드 성공")
-            text_content = self._parse_pdf(pdf_path)
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 403:
-                logger.warning(f"논문 '{paper.title}' 403 에러 발생, 셀레니움 다운로드 시도")
-                chrome_options = Options()
-                chrome_options.add_experimental_option("prefs", {
-                    "download.default_directory": self.download_dir,
-                    "download.prompt_for_download": False,
-                    "plugins.always_open_pdf_externally": True
-                })
-                chrome_options.add_argument("--no-sandbox")
-                chrome_options.add_argument("--disable-dev-shm-usage")
-                driver = webdriver.Chrome(options=chrome_options)
-                try:
-                    driver.get(paper.pdf_url)
-                    time.sleep(5)
-                    wait_time = 0
-                    latest_pdf_path = None
-                    while wait_time < 10:
-                        latest_pdf_path = self._find_latest_pdf()
-                        if latest_pdf_path and os.path.getsize(latest_pdf_path) > 0:
-                            break
-                        time.sleep(1)
-                        wait_time += 1
-                    latest_pdf_path = self._find_latest_pdf()
-                    if latest_pdf_path and os.path.getsize(latest_pdf_path) > 0:
-                        logger.warning(f"논문 '{paper.title}' PDF 셀레니움 다운로드 성공: {latest_pdf_path}")
-                        text_content = self._parse_pdf(latest_pdf_path)
-                        # PDF 파일 삭제
-                        try:
-                            os.remove(latest_pdf_path)
-                            logger.info(f"PDF 파일 삭제 완료: {latest_pdf_path}")
-                        except Exception as e:
-                            logger.error(f"PDF 파일 삭제 실패: {str(e)}")
-                    else:
-                        logger.error(f"논문 '{paper.title}' PDF 셀레니움 다운로드 실패: 파일 없음 또는 크기 0")
-                except Exception as se:
-                    logger.error(f"논문 '{paper.title}' 셀레니움 다운로드 중 예외: {str(se)}")
-                finally:
-                    driver.quit()
-                    # 셀레니움 다운로드 디렉토리의 모든 PDF 파일 삭제
-                    for pdf_file in glob.glob(os.path.join(self.download_dir, '*.pdf')):
-                        try:
-                            os.remove(pdf_file)
-                            logger.info(f"남은 PDF 파일 삭제 완료: {pdf_file}")
-                        except Exception as e:
-                            logger.error(f"PDF 파일 삭제 실패: {str(e)}")
-            else:
-                logger.error(f"논문 '{paper.title}' PDF 다운로드 실패: {str(e)}")
-        except Exception as e:
-            logger.error(f"논문 '{paper.title}' PDF 다운로드 중 예외: {str(e)}")
-        # 파일 정리
-        if os.path.exists(pdf_path):
-            try:
-                os.remove(pdf_path)
-                logger.info(f"임시 PDF 파일 삭제 완료: {pdf_path}")
-            except Exception as e:
-                logger.error(f"임시 PDF 파일 삭제 실패: {str(e)}")
+        text_content = self._crawl_text(paper)
         # CrawledPaper 생성
         crawled_paper = CrawledPaper(
             title=paper.title,
@@ -202,4 +296,4 @@ class CrawlingService:
         logger.info(f"단일 논문 처리 완료 (텍스트 길이: {len(text_content) if text_content else 0})")
         print(f"[DEBUG] {crawled_paper.title} | 텍스트 길이: {len(crawled_paper.text_content) if crawled_paper.text_content else 0}")
         print(f"[DEBUG] 일부 텍스트: {crawled_paper.text_content[:200] if crawled_paper.text_content else 'None'}")
-        return crawled_paper
\ No newline at end of file
+        return crawled_paper
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+import time
+
+from typing import Dict, Iterable, Optional
+
+import redis
+
+from app.services.record_codec import pack_text, unpack_text
+
+# ───── 상수
+_BACKEND        = os.getenv("DOC_STORE_BACKEND", "redis")        # redis | fs
+_DOC_DIR        = os.getenv("DOC_STORE_DIR", "./documents")      # fs 백엔드: 워커 간 공유 디렉토리 (NFS 등)
+_TTL            = int(os.getenv("DOC_STORE_TTL", 86400))         # 회의 처리 중 실패한 태스크의 문서도 이 시간 뒤 정리
+_REDIS_DB       = 6
+_SWEEP_INTERVAL = 600                                            # fs 백엔드 만료 파일 정리 주기 (초)
+
+logger = logging.getLogger(__name__)
+
+
+def document_id(text: str) -> str:
+    """본문 텍스트의 해시 (같은 본문은 회의가 달라도 한 번만 저장)"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class RedisDocumentStore:
+    """
+    Redis 기반 문서 저장소.
+    - doc:{doc_id}  record_codec 봉투로 압축된 본문 (EX=ttl, 같은 문서를 다시 저장하면 만료 시각만 연장)
+    """
+
+    def __init__(self, ttl: int = _TTL, client: Optional[redis.Redis] = None):
+        self.ttl = ttl
+        self.client = client or redis.Redis(host="localhost", port=6379, db=_REDIS_DB)
+
+    @staticmethod
+    def _key(doc_id: str) -> str:
+        return f"doc:{doc_id}"
+
+    def put(self, text: str) -> str:
+        doc_id = document_id(text)
+        # 이미 있으면 압축/전송 없이 만료 시각만 갱신
+        if not self.client.expire(self._key(doc_id), self.ttl):
+            self.client.set(self._key(doc_id), pack_text(text), ex=self.ttl)
+        return doc_id
+
+    def get(self, doc_id: str) -> Optional[str]:
+        blob = self.client.get(self._key(doc_id))
+        return unpack_text(blob) if blob is not None else None
+
+    def get_many(self, doc_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        doc_ids = list(dict.fromkeys(doc_ids))
+        if not doc_ids:
+            return {}
+        blobs = self.client.mget([self._key(doc_id) for doc_id in doc_ids])
+        return {doc_id: unpack_text(blob) if blob is not None else None for doc_id, blob in zip(doc_ids, blobs)}
+
+    def delete(self, doc_id: str) -> None:
+        self.client.delete(self._key(doc_id))
+
+
+class FileDocumentStore:
+    """
+    공유 파일시스템 기반 문서 저장소 ({dir}/{doc_id 앞 2자}/{doc_id}.z).
+    읽기는 mmap으로 매핑한 버퍼를 바로 압축 해제해 중간 복사본을 만들지 않는다.
+    만료는 파일 mtime 기준이며, 저장 시 주기적으로 오래된 파일을 정리한다.
+    """
+
+    def __init__(self, ttl: int = _TTL, directory: str = _DOC_DIR):
+        self.ttl = ttl
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, doc_id: str) -> str:
+        return os.path.join(self.directory, doc_id[:2], f"{doc_id}.z")
+
+    def put(self, text: str) -> str:
+        doc_id = document_id(text)
+        path = self._path(doc_id)
+        try:
+            # 이미 있으면 만료 시각만 갱신
+            os.utime(path)
+        except OSError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(pack_text(text))
+            os.replace(tmp_path, path)
+        self._maybe_sweep()
+        return doc_id
+
+    def get(self, doc_id: str) -> Optional[str]:
+        path = self._path(doc_id)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_mtime + self.ttl < time.time():
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return unpack_text(mapped)
+        except (OSError, ValueError):
+            # 파일 없음 / 빈 파일(mmap 불가)
+            return None
+
+    def get_many(self, doc_ids: Iterable[str]) -> Dict[str, Optional[str]]:
+        return {doc_id: self.get(doc_id) for doc_id in dict.fromkeys(doc_ids)}
+
+    def delete(self, doc_id: str) -> None:
+        try:
+            os.remove(self._path(doc_id))
+        except OSError:
+            pass
+
+    def _maybe_sweep(self) -> None:
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep < _SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+        expired_before = now - self.ttl
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < expired_before:
+                        os.remove(path)
+                except OSError:
+                    pass
+
+
+def create_document_store(backend: str = _BACKEND):
+    """DOC_STORE_BACKEND 환경변수(redis | fs)에 따라 문서 저장소 생성"""
+    if backend == "redis":
+        return RedisDocumentStore()
+    if backend == "fs":
+        return FileDocumentStore()
+    raise ValueError(f"지원하지 않는 문서 저장소 백엔드입니다: {backend}")
+
+
+# pdf_worker → relevance_worker → llm_worker 간에 본문 대신 doc_id만 전달
+document_store = create_document_store()
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import logging
+import os
+import time
+
+from typing import Dict, Iterable, Optional
+
+import redis
+
+from app.services.http_pool import host_of
+
+# ───── 상수
+_REDIS_DB           = 5
+_ALPHA              = float(os.getenv("HOST_HEALTH_ALPHA", 0.2))            # EWMA 가중치 (최근 결과 비중)
+_FAILURE_THRESHOLD  = int(os.getenv("HOST_HEALTH_FAILURES", 5))             # 연속 실패 N회면 차단
+_BASE_COOLDOWN      = int(os.getenv("HOST_HEALTH_COOLDOWN", 60))            # 첫 차단 시간 (초), 재차단 시 2배씩
+_MAX_COOLDOWN       = int(os.getenv("HOST_HEALTH_MAX_COOLDOWN", 3600))
+_FORBIDDEN_RATE     = float(os.getenv("HOST_HEALTH_FORBIDDEN_RATE", 0.7))   # 이 이상이면 403 호스트로 판단
+_MIN_SAMPLES        = 5
+_SLOW_LATENCY       = 10.0                                                  # 점수 계산 기준 응답 시간 (초)
+_KEY_TTL            = 7 * 86400
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis(host="localhost", port=6379, db=_REDIS_DB)
+
+# Redis 키 구성
+# - host_health:{host}        latency / error_rate / forbidden_rate (EWMA), samples,
+#                             failures (연속 실패), cooldown, open_until,
+#                             downloads (forbidden_rate에 반영된 다운로드 요청 수) (hash)
+# - host_health:{host}:probe  차단 해제 직후 시험 요청 1건만 허용하기 위한 선점 키
+
+# 여러 워커가 동시에 기록해도 EWMA/연속 실패 갱신이 섞이지 않도록 Lua 스크립트로 원자 처리
+_RECORD_SCRIPT = redis_client.register_script("""
+local h = redis.call('HMGET', KEYS[1], 'latency', 'error_rate', 'forbidden_rate', 'samples', 'failures', 'cooldown',
+                     'open_until', 'downloads')
+local alpha = tonumber(ARGV[1])
+local function ewma(old, x)
+    if not old then return x end
+    return alpha * x + (1 - alpha) * tonumber(old)
+end
+local is_error = tonumber(ARGV[3])
+local failures = tonumber(h[5] or '0')
+local cooldown = tonumber(h[6] or '0')
+if is_error == 1 then
+    failures = failures + 1
+else
+    failures = 0
+    cooldown = 0
+    redis.call('HDEL', KEYS[1], 'open_until')
+end
+-- 차단 시간은 차단이 열리는 순간에만 설정/2배: 임계치에 처음 도달했을 때, 또는 차단 시간이 지난 뒤의 시험 요청이 실패했을 때.
+-- 차단 직전에 이미 진행 중이던 요청들의 실패는 open_until을 늘리지 않는다.
+local threshold = tonumber(ARGV[6])
+local now = tonumber(ARGV[5])
+if failures == threshold or (failures > threshold and now >= tonumber(h[7] or '0')) then
+    cooldown = math.min(math.max(cooldown * 2, tonumber(ARGV[7])), tonumber(ARGV[8]))
+    redis.call('HSET', KEYS[1], 'open_until', now + cooldown)
+end
+-- 검증(HEAD) 요청은 forbidden_rate에 반영하지 않음 (ARGV[4] == '')
+if ARGV[4] ~= '' then
+    redis.call('HSET', KEYS[1],
+        'forbidden_rate', ewma(h[3], tonumber(ARGV[4])),
+        'downloads', tonumber(h[8] or '0') + 1)
+end
+redis.call('HSET', KEYS[1],
+    'latency', ewma(h[1], tonumber(ARGV[2])),
+    'error_rate', ewma(h[2], is_error),
+    'samples', tonumber(h[4] or '0') + 1,
+    'failures', failures,
+    'cooldown', cooldown)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[9]))
+return failures
+""")
+
+_FIELDS = ("latency", "error_rate", "forbidden_rate", "samples", "failures", "open_until", "downloads")
+
+
+def _key(host: str) -> str:
+    return f"host_health:{host}"
+
+
+def record(url: str, elapsed: float, status_code: Optional[int] = None, error: bool = False,
+           validation: bool = False) -> None:
+    """
+    요청 1건의 결과 기록.
+    - error: 타임아웃/연결 실패/5xx/429/PDF가 아닌 응답 등 다시 시도해도 실패할 가능성이 높은 결과
+    - status_code == 403: 차단(봇 감지) 응답, 브라우저 우회 여부 판단에 사용
+    - validation: PDF 링크 검증(HEAD) 요청. HEAD에만 403/405를 반환하는 호스트가 많으므로
+      forbidden_rate에는 반영하지 않고 응답 시간/실패만 기록한다.
+    Redis 장애는 요청 흐름에 영향을 주지 않도록 무시한다.
+    """
+    host = host_of(url)
+    if not host:
+        return
+    forbidden = "" if validation else int(status_code == 403)
+    try:
+        failures = _RECORD_SCRIPT(
+            keys=[_key(host)],
+            args=[_ALPHA, elapsed, int(error), forbidden, time.time(),
+                  _FAILURE_THRESHOLD, _BASE_COOLDOWN, _MAX_COOLDOWN, _KEY_TTL],
+        )
+        if failures == _FAILURE_THRESHOLD:
+            logger.warning(f"[HostHealth] {host} 연속 {failures}회 실패 → 차단")
+    except redis.RedisError as e:
+        logger.warning(f"[HostHealth] 기록 실패: {e}")
+
+
+def _decode(values) -> Optional[Dict[str, float]]:
+    if values[3] is None:   # samples 없음 = 기록 없는 호스트
+        return None
+    return {field: float(value) for field, value in zip(_FIELDS, values) if value is not None}
+
+
+def _state(host: str) -> Optional[Dict[str, float]]:
+    try:
+        return _decode(redis_client.hmget(_key(host), _FIELDS))
+    except redis.RedisError as e:
+        logger.warning(f"[HostHealth] 조회 실패: {e}")
+        return None
+
+
+def _is_open(state: Optional[Dict[str, float]], now: float) -> bool:
+    return state is not None and state.get("open_until", 0) > now
+
+
+def allow_request(url: str) -> bool:
+    """
+    호스트 차단(circuit open) 여부 확인. 차단 시간이 지난 직후에는 시험 요청 1건만 허용하고
+    그 결과(record)에 따라 차단이 해제되거나 더 긴 시간으로 다시 차단된다.
+    """
+    host = host_of(url)
+    state = _state(host)
+    if state is None or state.get("failures", 0) < _FAILURE_THRESHOLD:
+        return True
+    now = time.time()
+    if _is_open(state, now):
+        return False
+    try:
+        return bool(redis_client.set(f"{_key(host)}:probe", 1, nx=True, ex=_BASE_COOLDOWN))
+    except redis.RedisError:
+        return True
+
+
+def prefers_browser(url: str) -> bool:
+    """대부분의 직접 요청에 403을 반환하는 호스트면 True (바로 브라우저 다운로드 사용)"""
+    state = _state(host_of(url))
+    return (state is not None and state.get("downloads", 0) >= _MIN_SAMPLES
+            and state.get("forbidden_rate", 0) >= _FORBIDDEN_RATE)
+
+
+def _score(state: Optional[Dict[str, float]], now: float) -> float:
+    """0~1 건강 점수 (기록이 없으면 1, 차단 중이면 0)"""
+    if state is None:
+        return 1.0
+    if _is_open(state, now):
+        return 0.0
+    success = 1 - state.get("error_rate", 0)
+    latency_factor = 1 / (1 + state.get("latency", 0) / _SLOW_LATENCY)
+    return success * (1 - 0.5 * state.get("forbidden_rate", 0)) * latency_factor
+
+
+def host_scores(urls: Iterable[str]) -> Dict[str, float]:
+    """여러 URL의 호스트 건강 점수를 한 번에 조회 (호스트 → 점수). Redis 장애 시 모두 1"""
+    hosts = list(dict.fromkeys(host_of(url) for url in urls if url))
+    if not hosts:
+        return {}
+    try:
+        pipe = redis_client.pipeline()
+        for host in hosts:
+            pipe.hmget(_key(host), _FIELDS)
+        states = [_decode(values) for values in pipe.execute()]
+    except redis.RedisError as e:
+        logger.warning(f"[HostHealth] 조회 실패: {e}")
+        return {host: 1.0 for host in hosts}
+    now = time.time()
+    return {host: _score(state, now) for host, state in zip(hosts, states)}
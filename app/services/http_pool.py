@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import threading
+
+from contextlib import contextmanager
+from typing import Dict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+
+def create_session(pool_size: int = 16) -> requests.Session:
+    """호스트별 커넥션을 재사용하는 requests 세션 (스레드 간 공유 가능)"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": _USER_AGENT})
+    return session
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class HostLimiter:
+    """호스트(도메인)별 동시 요청 수 제한"""
+
+    def __init__(self, per_host: int, overrides: Dict[str, int] | None = None):
+        self.per_host = per_host
+        self.overrides = overrides or {}
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                limit = next(
+                    (n for suffix, n in self.overrides.items() if host.endswith(suffix)),
+                    self.per_host,
+                )
+                sem = threading.BoundedSemaphore(limit)
+                self._semaphores[host] = sem
+            return sem
+
+    @contextmanager
+    def limit(self, url: str):
+        sem = self._semaphore(host_of(url))
+        with sem:
+            yield
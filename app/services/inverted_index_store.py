@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Set, Tuple
+
+import pymysql
+
+# ───── 상수
+_BACKEND      = os.getenv("INDEX_STORE_BACKEND", "mysql")           # mysql | sqlite
+_DB_HOST      = os.getenv("INDEX_DB_HOST", "localhost")
+_DB_USER      = os.getenv("INDEX_DB_USER", "")
+_DB_PASSWORD  = os.getenv("INDEX_DB_PASSWORD", "!")
+_DB_NAME      = os.getenv("INDEX_DB_NAME", "ds")
+_POOL_SIZE    = int(os.getenv("INDEX_DB_POOL_SIZE", 2))             # 워커 프로세스당 연결 수
+_SQLITE_PATH  = os.getenv("INDEX_SQLITE_PATH", "./inverted_index.db")
+_TABLE        = "inverted_index"
+_INSERT_BATCH = 1000                                                # executemany 1회당 행 수
+_MAX_WORD_LEN = 64                                                  # 이보다 긴 토큰은 PDF 추출 잡음으로 보고 제외
+
+logger = logging.getLogger(__name__)
+
+# inverted_index 테이블 (같은 회의의 같은 단어는 1행, 재실행/중복 태스크는 INSERT IGNORE로 무시)
+# paper_word는 _bin collation: 기본 _ci/_ai collation이면 unique key에서 "résumé"/"resume" 같은
+# 악센트·대소문자 변형이 같은 값으로 충돌해 INSERT IGNORE가 조용히 버린다 (index_words가 소문자로 바꾸므로 대소문자는 그대로 1행).
+# INSERT IGNORE는 잘림 오류도 경고로 바꾸므로, _MAX_WORD_LEN(= VARCHAR 길이, 문자 단위)보다 긴 단어는 미리 제외한다.
+# 기존 테이블 (collation을 먼저 바꾼 뒤 중복 행을 제거해야 unique key 추가가 실패하지 않음.
+# 기존 데이터에는 청크별 INSERT로 생긴 중복 행이 있고, 테이블에 id 컬럼이 없으므로 중복 제거는 DISTINCT 복사본으로 교체한다):
+#   DELETE FROM inverted_index WHERE CHAR_LENGTH(paper_word) > 64;
+#   ALTER TABLE inverted_index MODIFY paper_word VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL;
+#   CREATE TABLE inverted_index_dedup LIKE inverted_index;
+#   INSERT INTO inverted_index_dedup (paper_word, meeting_id) SELECT DISTINCT paper_word, meeting_id FROM inverted_index;
+#   RENAME TABLE inverted_index TO inverted_index_old, inverted_index_dedup TO inverted_index;
+#   DROP TABLE inverted_index_old;
+#   ALTER TABLE inverted_index ADD UNIQUE KEY uq_meeting_word (meeting_id, paper_word);
+_MYSQL_DDL = (
+    "CREATE TABLE IF NOT EXISTS {table} ("
+    " paper_word VARCHAR(64) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,"
+    " meeting_id VARCHAR(64) NOT NULL,"
+    " UNIQUE KEY uq_meeting_word (meeting_id, paper_word)"
+    ") DEFAULT CHARSET = utf8mb4"
+)
+
+
+def index_words(text: str) -> Set[str]:
+    """띄어쓰기 단위로 분리해 소문자로 바꾼 고유 단어"""
+    return {word.lower() for word in text.split() if len(word) <= _MAX_WORD_LEN}
+
+
+def _batches(rows: List[Tuple[str, str]], size: int = _INSERT_BATCH) -> Iterator[List[Tuple[str, str]]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class _ConnectionPool:
+    """
+    pymysql 연결 풀 (워커 프로세스마다 1개, 최대 size개 연결을 재사용).
+    사용 중 오류가 난 연결은 풀에 돌려놓지 않고 닫는다.
+    """
+
+    def __init__(self, size: int):
+        self._idle: "queue.LifoQueue[pymysql.connections.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @staticmethod
+    def _connect() -> pymysql.connections.Connection:
+        return pymysql.connect(
+            host=_DB_HOST,
+            user=_DB_USER,
+            password=_DB_PASSWORD,
+            db=_DB_NAME,
+            charset='utf8mb4',
+            autocommit=False,
+        )
+
+    @contextmanager
+    def connection(self) -> Iterator[pymysql.connections.Connection]:
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+                conn.ping(reconnect=True)
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            except Exception:
+                conn.close()
+                raise
+            self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class MySQLIndexStore:
+    """MySQL 역색인 저장소 (연결 풀 + 다중 행 INSERT IGNORE)"""
+
+    def __init__(self, pool_size: int = _POOL_SIZE, table: str = _TABLE):
+        self.pool_size = pool_size
+        self.table = table
+        self._sql = f"INSERT IGNORE INTO {table} (paper_word, meeting_id) VALUES (%s, %s)"
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> _ConnectionPool:
+        """fork된 워커 프로세스는 부모의 연결을 공유하지 않도록 프로세스마다 새 풀 생성"""
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = _ConnectionPool(self.pool_size)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def create_table(self) -> None:
+        """테이블이 없으면 생성 (벤치마크 전용 테이블 등)"""
+        with self._get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(_MYSQL_DDL.format(table=self.table))
+            conn.commit()
+
+    def add_words(self, meeting_id: str, words: Iterable[str]) -> int:
+        """단어를 회의에 연결해 저장하고 새로 추가된 행 수를 반환"""
+        rows = [(word, meeting_id) for word in words]
+        if not rows:
+            return 0
+        inserted = 0
+        with self._get_pool().connection() as conn:
+            with conn.cursor() as cursor:
+                # pymysql은 INSERT ... VALUES의 executemany를 다중 행 INSERT 문으로 묶어 전송
+                for batch in _batches(rows):
+                    inserted += cursor.executemany(self._sql, batch)
+            conn.commit()
+        return inserted
+
+
+class SQLiteIndexStore:
+    """
+    로컬 SQLite 역색인 저장소 (MySQL 없이 벤치마크/개발용).
+    테이블 구조와 중복 무시 동작은 MySQL과 같다.
+    """
+
+    _SQL = "INSERT OR IGNORE INTO inverted_index (paper_word, meeting_id) VALUES (?, ?)"
+
+    def __init__(self, path: str = _SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS inverted_index ("
+                " paper_word TEXT NOT NULL,"
+                " meeting_id TEXT NOT NULL,"
+                " UNIQUE (meeting_id, paper_word))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """스레드/프로세스마다 1개의 연결 재사용"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add_words(self, meeting_id: str, words: Iterable[str]) -> int:
+        rows = [(word, meeting_id) for word in words]
+        if not rows:
+            return 0
+        conn = self._connection()
+        with conn:
+            before = conn.total_changes
+            for batch in _batches(rows):
+                conn.executemany(self._SQL, batch)
+            return conn.total_changes - before
+
+
+def create_index_store(backend: str = _BACKEND):
+    """INDEX_STORE_BACKEND 환경변수(mysql | sqlite)에 따라 역색인 저장소 생성"""
+    if backend == "mysql":
+        return MySQLIndexStore()
+    if backend == "sqlite":
+        return SQLiteIndexStore()
+    raise ValueError(f"지원하지 않는 역색인 저장소 백엔드입니다: {backend}")
@@ -1,10 +1,14 @@
 import google.generativeai as genai
 import os
-from typing import List
+from typing import Callable, List, Optional
 from app.dtos.crawled_paper_dto import CrawledPaper
-from app.dtos.keyword_summary_dto import KeywordSummaryResult
+from app.dtos.keyword_summary_dto import KeywordSummaryResult, MeetingAnalysisResult
 from app.dtos.summarized_paper_dto import SummarizedPaper
 from google.api_core.exceptions import ResourceExhausted
+from pydantic import ValidationError
+from concurrent.futures import ThreadPoolExecutor
+import json
+import re
 import time
 import random
 
@@ -21,6 +25,9 @@ GEMINI_API_KEYS = [key for key in GEMINI_API_KEYS if key]
 if not GEMINI_API_KEYS:
     raise ValueError("환경변수에 Gemini API 토큰이 설정되지 않았습니다. .env 파일을 확인해주세요.")
 
+# 회의록 분석 fallback 경로(개별 호출 3건)를 동시에 실행하기 위한 스레드 풀
+_analysis_executor = ThreadPoolExecutor(max_workers=int(os.getenv('LLM_ANALYSIS_WORKERS', 9)))
+
 # 토큰 사용 횟수를 추적하는 딕셔너리
 token_usage = {key: 0 for key in GEMINI_API_KEYS}
 
@@ -38,8 +45,11 @@ def configure_gemini(token: str):
     """Gemini API 설정"""
     genai.configure(api_key=token)
 
-def call_gemini_with_retry(prompt: str, max_retries: int = 3) -> str:
-    """여러 토큰을 사용하여 Gemini API 호출"""
+def call_gemini_with_retry(prompt: str, max_retries: int = 3, on_partial: Optional[Callable[[str], None]] = None) -> str:
+    """
+    여러 토큰을 사용하여 Gemini API 호출
+    on_partial을 주면 스트리밍으로 받아 청크가 올 때마다 지금까지 받은 텍스트로 호출 (재시도 시 처음부터 다시 호출됨)
+    """
     retries = 0
     last_error = None
     
@@ -51,11 +61,18 @@ def call_gemini_with_retry(prompt: str, max_retries: int = 3) -> str:
             
             # Gemini API 호출
             model = genai.GenerativeModel("gemini-1.5-flash")
-            response = model.generate_content(prompt)
+            if on_partial is None:
+                response = model.generate_content(prompt)
+                text = response.text
+            else:
+                text = ""
+                for chunk in model.generate_content(prompt, stream=True):
+                    text += chunk.text
+                    on_partial(text)
             
             # 성공 시 토큰 사용 횟수 증가
             token_usage[token] += 1
-            return response.text.strip()
+            return text.strip()
             
         except ResourceExhausted as e:
             last_error = e
@@ -73,9 +90,9 @@ def call_gemini_with_retry(prompt: str, max_retries: int = 3) -> str:
     
     raise Exception(f"최대 재시도 횟수 초과. 마지막 에러: {str(last_error)}")
 
-def extract_keywords(text: str) -> KeywordSummaryResult:
+def extract_keyword_list(text: str) -> List[str]:
     """
-    회의록 텍스트로부터 키워드와 요약을 추출 (Gemini API 활용)
+    회의록 텍스트로부터 핵심 키워드 5개 추출 (Gemini API 활용)
     """
     meeting_prompt = f"""
     The following is a meeting transcript from a research lab.
@@ -90,16 +107,18 @@ def extract_keywords(text: str) -> KeywordSummaryResult:
     ---
     """
     
-    # 키워드 추출
     keywords_text = call_gemini_with_retry(meeting_prompt)
     keywords = []
     for line in keywords_text.splitlines():
         kw = line.strip("-•* ")
         if kw:
             keywords.append(kw)
-    keywords = keywords[:5]
+    return keywords[:5]
 
-    # 요약 추출
+def summarize_meeting(text: str) -> str:
+    """
+    회의록 텍스트의 주요 논의 내용을 3~4문장으로 요약 (Gemini API 활용)
+    """
     summary_prompt = f"""
     다음은 한 연구실의 회의록입니다.
     이 회의록의 주요 논의 내용을 3~4문장으로 자연스럽게 요약해 주세요.
@@ -109,11 +128,15 @@ def extract_keywords(text: str) -> KeywordSummaryResult:
     {text}
     ---
     """
-    summary = call_gemini_with_retry(summary_prompt)
+    return call_gemini_with_retry(summary_prompt)
 
+def extract_keywords(text: str) -> KeywordSummaryResult:
+    """
+    회의록 텍스트로부터 키워드와 요약을 추출 (Gemini API 활용)
+    """
     return KeywordSummaryResult(
-        summary=summary,
-        keywords=keywords
+        summary=summarize_meeting(text),
+        keywords=extract_keyword_list(text)
     )
 
 def summarize_papers(papers: List[CrawledPaper]) -> List[SummarizedPaper]:
@@ -168,3 +191,100 @@ def translate_to_english(text: str) -> str:
     ---
     """
     return call_gemini_with_retry(prompt)
+
+def _parse_json_response(text: str) -> dict:
+    """코드 블록(```json ... ```) 등으로 감싸진 응답에서 JSON 객체만 추출"""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("응답에서 JSON 객체를 찾을 수 없습니다.")
+    return json.loads(text[start:end + 1])
+
+# 스트리밍 응답에서 "keywords" 배열이 닫히는 즉시 꺼내기 위한 패턴
+_KEYWORDS_RE = re.compile(r'"keywords"\s*:\s*(\[[^\]]*\])')
+
+def _clean_keywords(keywords: List[str]) -> List[str]:
+    return [kw.strip("-•* ") for kw in keywords if isinstance(kw, str) and kw.strip("-•* ")][:5]
+
+def _analyze_meeting_per_call(text: str, keywords: Optional[List[str]],
+                              on_keywords: Optional[Callable[[List[str]], None]]) -> MeetingAnalysisResult:
+    """
+    키워드/요약/번역을 개별 프롬프트로 동시에 요청 (구조화 응답 실패 시 fallback)
+    스트리밍 중 이미 키워드를 전달했다면 키워드는 다시 요청하지 않는다.
+    """
+    keywords_future = _analysis_executor.submit(extract_keyword_list, text) if keywords is None else None
+    summary_future = _analysis_executor.submit(summarize_meeting, text)
+    translation_future = _analysis_executor.submit(translate_to_english, text)
+    if keywords_future is not None:
+        keywords = keywords_future.result()
+        if on_keywords is not None:
+            on_keywords(keywords)
+    return MeetingAnalysisResult(
+        summary=summary_future.result(),
+        keywords=keywords,
+        translation=translation_future.result()
+    )
+
+def analyze_meeting(text: str, on_keywords: Optional[Callable[[List[str]], None]] = None) -> MeetingAnalysisResult:
+    """
+    회의록을 한 번만 전송해 키워드, 한국어 요약, 영어 번역을 JSON 하나로 받아온다.
+    on_keywords를 주면 응답을 스트리밍으로 받아, 맨 앞의 키워드 배열이 완성되는 즉시 1회 호출한다.
+    (요약/번역 생성을 기다리지 않고 map 태스크를 발행하기 위함. 반환값의 키워드는 이때 전달한 키워드와 같다)
+    JSON 파싱/검증에 실패하면 기존 개별 호출 경로로 대체한다.
+    """
+    emitted: List[List[str]] = []
+    callback_errors: List[Exception] = []
+
+    def on_partial(partial: str) -> None:
+        if emitted or on_keywords is None:
+            return
+        match = _KEYWORDS_RE.search(partial)
+        if not match:
+            return
+        try:
+            keywords = _clean_keywords(json.loads(match.group(1)))
+        except ValueError:
+            return
+        if len(keywords) >= 2:
+            emitted.append(keywords)
+            # 콜백 예외가 Gemini 호출 재시도로 삼켜지지 않도록 모아 두었다가 스트림이 끝난 뒤 다시 발생
+            try:
+                on_keywords(keywords)
+            except Exception as e:
+                callback_errors.append(e)
+
+    prompt = f"""
+    The following is a meeting transcript from a research lab, written in Korean.
+    Respond with a single JSON object only, with no code fences or explanations,
+    that matches this schema:
+
+    {{
+      "keywords": ["<word>", "<word>", "<word>", "<word>", "<word>"],
+      "summary": "<string>",
+      "translation": "<string>"
+    }}
+
+    - "keywords": exactly 5 core research keywords. Each keyword must be a single
+      English word (no phrases) without any symbols.
+    - "summary": a natural 3~4 sentence summary of the main discussion, written in Korean.
+    - "translation": a natural English translation of the full transcript.
+
+    [Meeting Transcript]
+    ---
+    {text}
+    ---
+    """
+    raw = call_gemini_with_retry(prompt, on_partial=on_partial if on_keywords is not None else None)
+    if callback_errors:
+        raise callback_errors[0]
+    try:
+        result = MeetingAnalysisResult.model_validate(_parse_json_response(raw))
+        keywords = emitted[0] if emitted else _clean_keywords(result.keywords)
+        if len(keywords) < 2 or not result.summary.strip() or not result.translation.strip():
+            raise ValueError(f"응답 필드가 비어 있습니다: keywords={keywords}")
+    except (ValueError, ValidationError) as e:
+        # json.JSONDecodeError도 ValueError의 하위 클래스
+        print(f"[LLM Service] 구조화 응답 파싱 실패 → 개별 호출로 대체: {e}")
+        return _analyze_meeting_per_call(text, emitted[0] if emitted else None, on_keywords)
+    if not emitted and on_keywords is not None:
+        on_keywords(keywords)
+    return result.model_copy(update={"keywords": keywords})
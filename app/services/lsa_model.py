@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+
+from app.services import relevance_model
+
+# ───── 상수
+_MODEL_DIR       = os.getenv("LSA_MODEL_DIR", "./lsa_model")        # 워커 간 공유 디렉토리 (학습 스크립트가 기록)
+_N_COMPONENTS    = int(os.getenv("LSA_COMPONENTS", 256))
+_MIN_DF          = int(os.getenv("LSA_MIN_DF", 2))                  # 이보다 적은 논문에만 나온 특성은 학습/투영에서 제외
+_MIN_DOCS        = int(os.getenv("LSA_MIN_DOCS", 50))               # 학습에 필요한 최소 논문 수
+_RELOAD_INTERVAL = 60                                               # 새 모델 버전 확인 주기 (초)
+_KEEP_VERSIONS   = int(os.getenv("LSA_KEEP_VERSIONS", 3))           # 학습 후 남길 최근 버전 수
+_KEEP_SECONDS    = int(os.getenv("LSA_KEEP_SECONDS", 86400))        # 이보다 최근 버전은 수와 관계없이 유지 (회의 컨텍스트 TTL 이상)
+_MAX_LOADED      = 3                                                # 프로세스당 동시에 열어 둘 버전 수
+
+logger = logging.getLogger(__name__)
+
+# 모델 디렉토리 구성
+# - {version}/features.npy    학습에 쓰인 해시 특성 index (int32, 오름차순)
+# - {version}/components.npy  특성 × 잠재 차원 행렬 (float32, 행 = 특성이라 투영 시 필요한 행만 페이지 로드)
+# - {version}/meta.json       차원 수, 학습 논문 수, 설명 분산 비율, 학습 시각
+# - CURRENT                   새 회의에 쓸 버전 이름 (새 버전을 다 쓴 뒤 os.replace로 교체)
+# 버전 디렉토리는 학습마다 새로 만들고(기존 버전 파일을 덮어쓰지 않음), 회의는 시작 시 고정한 버전을 끝까지 쓴다.
+# 워커는 components.npy를 mmap으로 열어 여러 프로세스가 같은 페이지 캐시를 공유한다.
+# 입력은 relevance_model이 저장한 TF-IDF 벡터라 같은 해시 공간/IDF 척도를 그대로 쓴다.
+
+_lock = threading.Lock()
+_models: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}   # version → (features, components)
+_current: Optional[str] = None
+_checked_at = 0.0
+
+
+def current_version() -> Optional[str]:
+    """새 회의에 쓸 모델 버전 (최대 _RELOAD_INTERVAL마다 CURRENT 확인). 학습된 모델이 없으면 None"""
+    global _current, _checked_at
+    with _lock:
+        if _current is not None and time.monotonic() - _checked_at < _RELOAD_INTERVAL:
+            return _current
+        _checked_at = time.monotonic()
+        try:
+            with open(os.path.join(_MODEL_DIR, "CURRENT"), encoding="utf-8") as f:
+                _current = f.read().strip() or None
+        except FileNotFoundError:
+            _current = None
+        return _current
+
+
+def _load(version: str) -> Tuple[np.ndarray, np.ndarray]:
+    """버전별 모델 (mmap, 프로세스당 최근 _MAX_LOADED개 유지). 버전 디렉토리가 없으면 ValueError"""
+    with _lock:
+        model = _models.get(version)
+        if model is not None:
+            return model
+        path = os.path.join(_MODEL_DIR, version)
+        try:
+            model = (
+                np.load(os.path.join(path, "features.npy")),
+                np.load(os.path.join(path, "components.npy"), mmap_mode="r"),
+            )
+        except FileNotFoundError:
+            raise ValueError(f"LSA 모델 버전이 없습니다: {version}")
+        while len(_models) >= _MAX_LOADED:
+            _models.pop(next(iter(_models)))
+        _models[version] = model
+        logger.info(f"[LSA] 모델 로드: version={version}, 특성 {len(model[0])}개, 차원 {model[1].shape[1]}")
+        return model
+
+
+def _project(model: Tuple[np.ndarray, np.ndarray], vector: Dict[str, np.ndarray]) -> np.ndarray:
+    """TF-IDF 벡터 → 잠재 공간 L2 정규화 벡터 (모델에 없는 특성은 무시)"""
+    features, components = model
+    positions = np.searchsorted(features, vector["i"])
+    positions = np.minimum(positions, len(features) - 1)
+    mask = features[positions] == vector["i"]
+    rows = positions[mask]
+    order = np.argsort(rows)    # mmap 행을 오름차순으로 읽도록 정렬
+    latent = vector["d"][mask][order].astype(np.float32) @ components[rows[order]]
+    norm = np.linalg.norm(latent)
+    return latent / norm if norm else latent
+
+
+def score_documents(query: Dict[str, np.ndarray], doc_ids: Iterable[str],
+                    version: Optional[str] = None) -> Dict[str, Optional[float]]:
+    """
+    잠재 공간에서 회의록과 각 논문의 코사인 유사도 (밀집 벡터 내적).
+    동의어/다른 표현처럼 단어가 겹치지 않아도 같은 주제의 논문끼리 가까워진다.
+    version을 주면 그 버전(회의에 고정된 버전), 없으면 현재 버전의 모델을 쓴다.
+    저장된 TF-IDF 벡터가 없는 문서는 None. 모델이 아직 학습되지 않았으면 ValueError.
+    """
+    version = version or current_version()
+    if version is None:
+        raise ValueError("학습된 LSA 모델이 없습니다 (train_lsa.py 실행 필요)")
+    model = _load(version)
+    latent_query = _project(model, query)
+    return {
+        doc_id: float(np.dot(latent_query, _project(model, vector))) if vector is not None else None
+        for doc_id, vector in relevance_model.get_vectors(doc_ids).items()
+    }
+
+
+def _prune(keep: str) -> None:
+    """
+    오래된 버전 디렉토리 삭제. 최근 _KEEP_VERSIONS개와 _KEEP_SECONDS 안에 만든 버전은 남긴다
+    (진행 중인 회의가 고정한 버전이 지워지지 않도록). 이미 mmap으로 연 워커는 삭제 후에도 계속 읽을 수 있다.
+    """
+    versions = sorted(
+        (entry for entry in os.scandir(_MODEL_DIR) if entry.is_dir() and entry.name != keep),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    cutoff = time.time() - _KEEP_SECONDS
+    for entry in versions[max(_KEEP_VERSIONS - 1, 0):]:
+        if entry.stat().st_mtime < cutoff:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            logger.info(f"[LSA] 오래된 버전 삭제: version={entry.name}")
+
+
+def train(n_components: int = _N_COMPONENTS, min_df: int = _MIN_DF) -> str:
+    """
+    오프라인 학습: 코퍼스에 반영된 논문 중 TF-IDF 벡터가 남아 있는 논문으로 TruncatedSVD를 학습해
+    새 버전 디렉토리에 저장하고 CURRENT를 교체한 뒤 오래된 버전을 정리한다. 새 버전 이름을 반환.
+    """
+    doc_ids = sorted(member.decode() for member in relevance_model.redis_client.smembers("tfidf:docs"))
+    vectors = [vector for vector in relevance_model.get_vectors(doc_ids).values() if vector is not None]
+    if len(vectors) < _MIN_DOCS:
+        raise ValueError(f"학습할 논문이 부족합니다: {len(vectors)}편 (최소 {_MIN_DOCS}편)")
+
+    indptr = np.cumsum([0] + [len(vector["i"]) for vector in vectors])
+    matrix = sparse.csr_matrix(
+        (np.concatenate([vector["d"] for vector in vectors]),
+         np.concatenate([vector["i"] for vector in vectors]),
+         indptr),
+        shape=(len(vectors), relevance_model._N_FEATURES),
+    )
+    # 해시 공간(2^20) 전체가 아니라 min_df 이상인 특성 열만 남겨 모델 크기를 줄임
+    df = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    features = np.flatnonzero(df >= min_df).astype(np.int32)
+    matrix = matrix[:, features]
+    n_components = min(n_components, matrix.shape[0] - 1, len(features) - 1)
+    if n_components < 1:
+        raise ValueError(f"min_df={min_df} 이상인 특성이 부족합니다: {len(features)}개")
+
+    started = time.perf_counter()
+    svd = TruncatedSVD(n_components=n_components, algorithm="randomized", random_state=0)
+    svd.fit(matrix)
+    elapsed = time.perf_counter() - started
+
+    # 같은 초에 다시 학습해도 워커가 mmap 중인 기존 버전을 덮어쓰지 않도록 항상 새 디렉토리 생성
+    trained_at = time.strftime("%Y%m%d_%H%M%S")
+    os.makedirs(_MODEL_DIR, exist_ok=True)
+    path = tempfile.mkdtemp(prefix=f"{trained_at}_", dir=_MODEL_DIR)
+    os.chmod(path, 0o755)
+    version = os.path.basename(path)
+    np.save(os.path.join(path, "features.npy"), features)
+    np.save(os.path.join(path, "components.npy"), np.ascontiguousarray(svd.components_.T, dtype=np.float32))
+    with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "n_components": n_components,
+            "n_docs": len(vectors),
+            "n_features": len(features),
+            "explained_variance": float(svd.explained_variance_ratio_.sum()),
+            "trained_at": trained_at,
+        }, f)
+
+    tmp_path = os.path.join(_MODEL_DIR, "CURRENT.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(_MODEL_DIR, "CURRENT"))
+    _prune(version)
+    logger.info(f"[LSA] 학습 완료: version={version}, 논문 {len(vectors)}편, 특성 {len(features)}개, "
+                f"차원 {n_components}, 설명 분산 {svd.explained_variance_ratio_.sum():.3f}, {elapsed:.1f}초")
+    return version
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import logging
+import os
+
+from typing import Dict, Optional
+
+import numpy as np
+import redis
+
+from app.services import lsa_model, relevance_model
+
+# ───── 상수
+_REDIS_DB = 3
+_TTL      = int(os.getenv("MEETING_CONTEXT_TTL", 3 * 3600))   # 회의 1건의 전체 파이프라인이 끝날 때까지 유지
+# relevance 유사도 계산 방식: document(논문 전체 벡터, 기본) | chunk(청크별 코사인을 논문별로 pooling)
+#                           | lsa(잠재 의미 공간 코사인, train_lsa.py로 학습한 모델이 없으면 document로 대체)
+_SCORING  = os.getenv("RELEVANCE_SCORING", "document")
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis(host="localhost", port=6379, db=_REDIS_DB)
+
+# 회의 컨텍스트 (태스크에는 meeting_id만 전달하고 필요한 단계에서 조회)
+# - meeting:{meeting_id}:context  hash
+#     vector       영어 번역본의 TF-IDF 벡터 (relevance 단계에서 재사용, 회의당 1회 계산)
+#     scorer       회의에 고정한 유사도 계산 방식 (document | chunk | lsa:{모델 버전})
+#                  방식/모델마다 점수 척도가 달라, 회의 도중 모델이 학습·교체돼도 같은 회의 안에서는 섞지 않는다.
+# 번역본 원문과 키워드는 이후 단계에서 읽지 않으므로 저장하지 않는다 (키워드는 map 태스크 인자로 전달).
+
+
+def _key(meeting_id: str) -> str:
+    return f"meeting:{meeting_id}:context"
+
+
+def _pin_scorer(scoring: str) -> str:
+    if scoring not in ("document", "chunk", "lsa"):
+        raise ValueError(f"지원하지 않는 유사도 계산 방식입니다: {scoring}")
+    if scoring != "lsa":
+        return scoring
+    version = lsa_model.current_version()
+    if version is None:
+        logger.warning("[MeetingContext] 학습된 LSA 모델 없음 → 이 회의는 TF-IDF 유사도(document)로 고정")
+        return "document"
+    return f"lsa:{version}"
+
+
+def save(meeting_id: str, translation: str, scoring: str = _SCORING) -> None:
+    """게이트웨이에서 회의 분석 직후 1회 호출 (유사도 계산 방식과 LSA 모델 버전도 이때 고정)"""
+    pipe = redis_client.pipeline()
+    pipe.hset(_key(meeting_id), mapping={
+        "vector": relevance_model.pack_vector(relevance_model.query_vector(translation)),
+        "scorer": _pin_scorer(scoring),
+    })
+    pipe.expire(_key(meeting_id), _TTL)
+    pipe.execute()
+
+
+def _field(meeting_id: str, field: str) -> Optional[bytes]:
+    value = redis_client.hget(_key(meeting_id), field)
+    if value is None:
+        logger.warning(f"[MeetingContext] 컨텍스트 없음 (만료 또는 미등록): meeting_id={meeting_id}, field={field}")
+    return value
+
+
+def get_vector(meeting_id: str) -> Optional[Dict[str, np.ndarray]]:
+    value = _field(meeting_id, "vector")
+    return relevance_model.unpack_vector(value) if value is not None else None
+
+
+def get_scorer(meeting_id: str) -> str:
+    """회의에 고정된 유사도 계산 방식 (고정 전에 저장된 컨텍스트는 document)"""
+    value = redis_client.hget(_key(meeting_id), "scorer")
+    return value.decode() if value is not None else "document"
@@ -4,13 +4,19 @@ import itertools
 
 import requests, random
 import logging
+import os
 import time
 
 from urllib.parse import quote_plus, urlparse
-from typing import List
+from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
 
 from app.dtos.keyword_summary_dto import KeywordSummaryResult
 from app.dtos.paperItem_dto import PaperItem
+from app.services import host_health
+from app.services.response_cache import create_cache, get_json, set_json
+from app.services.http_pool import create_session, HostLimiter
+from app.services.rate_limiter import RedisTokenBucket
 from bs4 import BeautifulSoup
 
 
@@ -28,52 +34,112 @@ TRUSTED_PDF_PREFIXES = (
     "https://ieeexplore.ieee.org/",
 )
 _BACKOFF_CODES  = {429, 500, 502, 503, 504}
+_CACHE_TTL          = int(os.getenv("OPENALEX_CACHE_TTL", 86400))
+_CACHE_MAX_ENTRIES  = int(os.getenv("OPENALEX_CACHE_MAX_ENTRIES", 5000))
+_VALIDATION_TIMEOUT = (5, _TIMEOUT)                                       # (connect, read)
+_VALIDATION_WORKERS = int(os.getenv("PDF_VALIDATION_WORKERS", 8))
+_VALIDATION_PER_HOST = int(os.getenv("PDF_VALIDATION_PER_HOST", 3))
+_VERDICT_TTL        = int(os.getenv("PDF_VERDICT_TTL", 7 * 86400))
+_NEGATIVE_TTL       = int(os.getenv("PDF_NEGATIVE_TTL", 6 * 3600))
+_MAILTO             = os.getenv("OPENALEX_MAILTO")                         # polite pool 식별용
+_RATE_LIMIT         = float(os.getenv("OPENALEX_RATE_LIMIT", 8))           # 전체 워커 합산 초당 요청 수 (polite pool 한도 10)
+_RETRIEVE_WORKERS   = int(os.getenv("OPENALEX_RETRIEVE_WORKERS", 6))
+_TARGET_PAPERS      = 10
 
 logger = logging.getLogger(__name__)
 
+# OpenAlex 응답 캐시 (같은 키워드 집합으로 반복되는 회의 대비)
+openalex_cache = create_cache("openalex", _CACHE_TTL, max_entries=_CACHE_MAX_ENTRIES)
+# PDF 링크 검증 결과 캐시 (유효 / 무효를 따로 저장, 무효는 짧은 TTL)
+pdf_verdict_cache = create_cache("pdf_verdict", _VERDICT_TTL, max_entries=50000)
+pdf_negative_cache = create_cache("pdf_verdict_negative", _NEGATIVE_TTL, max_entries=50000)
+
+# PDF 링크 검증용 커넥션 풀 세션 + 호스트별 동시 요청 제한
+_session = create_session(pool_size=_VALIDATION_WORKERS)
+_host_limiter = HostLimiter(_VALIDATION_PER_HOST)
+_validation_executor = ThreadPoolExecutor(max_workers=_VALIDATION_WORKERS)
+
+# OpenAlex 호출 속도 제한 (Redis 공유, 모든 워커 프로세스 합산) + 단일 서버 검색용 스레드 풀
+_rate_limiter = RedisTokenBucket("openalex", _RATE_LIMIT)
+_retrieval_executor = ThreadPoolExecutor(max_workers=_RETRIEVE_WORKERS)
+
 
 # ───── 유틸리티
-def is_valid_pdf_url(url: str) -> bool:
+def _check_pdf_url(url: str) -> dict:
+    """
+    PDF 링크 검증 결과 {valid, final_url, transient} (풀링된 세션 + 호스트별 동시 요청 제한)
+    transient: 타임아웃/연결 오류/429/5xx처럼 다시 시도하면 결과가 달라질 수 있는 판정 (캐시하지 않음)
+    """
+    transient = False
     try:
-        head = requests.head(url, allow_redirects=True, timeout=_TIMEOUT)
+        with _host_limiter.limit(url):
+            started = time.monotonic()
+            try:
+                head = _session.head(url, allow_redirects=True, timeout=_VALIDATION_TIMEOUT)
+            except requests.RequestException:
+                host_health.record(url, time.monotonic() - started, error=True, validation=True)
+                raise
+            transient = head.status_code >= 500 or head.status_code == 429
+            host_health.record(url, time.monotonic() - started, head.status_code, error=transient,
+                               validation=True)
         if head.status_code == 404:
-            return False
+            return {"valid": False, "final_url": head.url, "transient": False}
 
         final_url = head.url
         domain = urlparse(final_url).netloc
 
         # MIT Press 특화: title 태그 기반 필터
         if "mit.edu" in domain:
-            resp = requests.get(final_url, timeout=_TIMEOUT)
+            with _host_limiter.limit(final_url):
+                resp = _session.get(final_url, timeout=_VALIDATION_TIMEOUT)
             soup = BeautifulSoup(resp.text, "html.parser")
             title = (soup.title.string or "").strip().lower()
             if "not found" in title:
-                return False
+                return {"valid": False, "final_url": final_url, "transient": transient}
 
         # 신뢰 PDF 링크
         if any(prefix in final_url for prefix in TRUSTED_PDF_PREFIXES):
-            return True
+            return {"valid": True, "final_url": final_url, "transient": transient}
 
         # 일반 필터
         if any(x in final_url for x in ["login", "subscribe", "abstract", "overview"]):
-            return False
+            return {"valid": False, "final_url": final_url, "transient": transient}
 
-        return True
+        return {"valid": True, "final_url": final_url, "transient": transient}
     except Exception:
+        # 요청 실패 (타임아웃, 연결 오류 등)
+        return {"valid": False, "final_url": None, "transient": True}
+
+
+def is_valid_pdf_url(url: str) -> bool:
+    # 이전 회의에서 검증된 링크는 캐시된 판정 사용 (유효/무효는 TTL을 달리해 따로 저장)
+    for cache in (pdf_verdict_cache, pdf_negative_cache):
+        verdict = get_json(cache, url)
+        if verdict is not None:
+            return verdict["valid"]
+
+    # 차단 중인 호스트는 검증 요청 없이 무효 처리 (일시적 판정이므로 캐시하지 않음)
+    if not host_health.allow_request(url):
         return False
 
+    verdict = _check_pdf_url(url)
+    # 일시적 실패는 캐시하지 않고 다음 회의에서 다시 검증
+    if not verdict["transient"]:
+        set_json(pdf_verdict_cache if verdict["valid"] else pdf_negative_cache, url, verdict)
+    return verdict["valid"]
+
+
+def validate_pdf_urls(urls: List[str]) -> Dict[str, bool]:
+    """여러 PDF 링크를 스레드 풀에서 동시에 검증 (중복 링크는 1회만 검증)"""
+    unique_urls = list(dict.fromkeys(urls))
+    return dict(zip(unique_urls, _validation_executor.map(is_valid_pdf_url, unique_urls)))
 
-def query_openalex(keywords: List[str]) -> List[dict]:
-    q = quote_plus(" ".join(keywords))
-    flt = f"from_publication_date:{_DATE_FROM},has_fulltext:true"
-    url = (
-        f"{_BASE_URL}?search={q}&filter={flt}&per_page={_PER_PAGE}"
-        f"&select=display_name,primary_location"
-    )
-    print(f"[OpenAlex] 검색 URL: {url}")
 
+def _request_openalex(url: str) -> Optional[dict]:
+    """OpenAlex API 호출 (백오프 1회 포함). 실패 시 None"""
     for attempt in range(2):  # 최대 2번 시도 (기본 1회 + 백오프 1회)
         try:
+            _rate_limiter.acquire()
             response = requests.get(url, timeout=_TIMEOUT)
             if response.status_code in _BACKOFF_CODES:
                 print(f"[OpenAlex] 상태코드 {response.status_code} → 백오프 시도")
@@ -81,30 +147,88 @@ def query_openalex(keywords: List[str]) -> List[dict]:
                     time.sleep(2)  # 2초 대기 후 재시도
                     continue
                 else:
-                    return []
-            data = response.json()
-            break
+                    return None
+            if response.status_code != 200:
+                print(f"[OpenAlex] 상태코드 {response.status_code} → 실패 처리")
+                return None
+            return response.json()
         except Exception as e:
             print(f"[OpenAlex] 요청 실패: {e}")
             if attempt == 0:
                 time.sleep(2)
                 continue
-            return []
+            return None
+    return None
+
+
+def _raw_pdf_url(work: dict) -> Optional[str]:
+    """work의 primary_location에서 검증 대상 PDF 링크를 꺼낸다"""
+    raw_pdf = (work.get("primary_location") or {}).get("pdf_url")
+    if raw_pdf and "bloomsburycollections.com" not in urlparse(raw_pdf).netloc:
+        return raw_pdf
+    return None
+
+
+def extract_pdf_urls(works: List[dict]) -> List[Optional[str]]:
+    """works 각각의 유효한 PDF 링크 (없거나 무효하면 None). 검증은 동시에 수행"""
+    raw_urls = [_raw_pdf_url(work) for work in works]
+    verdicts = validate_pdf_urls([url for url in raw_urls if url])
+    return [url if url and verdicts[url] else None for url in raw_urls]
+
+
+def _cache_key(search: str, flt: str, per_page: int, page: int, select: str) -> str:
+    """
+    OR로 묶인 절 단위로 정렬해 키워드 순서와 무관한 캐시 키 생성.
+    절 내부의 단어 순서와 구문(따옴표)은 그대로 두어 검색 결과가 다른 쿼리끼리 키를 공유하지 않도록 한다.
+    """
+    clauses = sorted(set(" ".join(clause.lower().split()) for clause in search.split(" OR ")))
+    return f"{' OR '.join(clauses)}|{flt}|{per_page}|{page}|{select}"
+
+
+def fetch_works(search: str, *, per_page: int = _PER_PAGE, page: int = 1,
+                select: str = "display_name,primary_location") -> List[dict]:
+    """검색어로 OpenAlex works 한 페이지를 가져온다 (PDF 검증 전 원본 결과)"""
+    flt = f"from_publication_date:{_DATE_FROM},has_fulltext:true"
+    cache_key = _cache_key(search, flt, per_page, page, select)
+    cached = get_json(openalex_cache, cache_key)
+    if cached is not None:
+        print(f"[OpenAlex] 캐시 적중: {search} (page={page})")
+        return cached
+
+    q = quote_plus(search)
+    url = (
+        f"{_BASE_URL}?search={q}&filter={flt}&per_page={per_page}&page={page}"
+        f"&select={select}"
+    )
+    if _MAILTO:
+        url += f"&mailto={quote_plus(_MAILTO)}"
+    print(f"[OpenAlex] 검색 URL: {url}")
+
+    data = _request_openalex(url)
+    # 실패/오류 응답은 캐시하지 않음 (빈 결과가 TTL 동안 고정되지 않도록)
+    if data is None or not isinstance(data.get("results"), list):
+        return []
+    results = data["results"]
+    set_json(openalex_cache, cache_key, results)
+    return results
+
+
+def query_openalex(keywords: List[str]) -> List[dict]:
+    works = fetch_works(" ".join(keywords))
+    pdf_urls = extract_pdf_urls(works)
 
     results = []
-    for rank, work in enumerate(data.get("results", []), start=1):
+    for rank, (work, pdf_url) in enumerate(zip(works, pdf_urls), start=1):
         title = work.get("display_name")
         if not title:
             continue
 
-        raw_pdf = (work.get("primary_location") or {}).get("pdf_url")
-        if raw_pdf and "bloomsburycollections.com" not in urlparse(raw_pdf).netloc:
-            if is_valid_pdf_url(raw_pdf):
-                results.append({
-                    "rank": rank,
-                    "title": title.strip(),
-                    "pdf": raw_pdf
-                })
+        if pdf_url:
+            results.append({
+                "rank": rank,
+                "title": title.strip(),
+                "pdf": pdf_url
+            })
 
     return results
 
@@ -113,43 +237,58 @@ def retrieve_papers(ks: KeywordSummaryResult) -> List[PaperItem]:
     if len(ks.keywords) != 5:
         raise ValueError("`keywords`는 정확히 5개의 단어가 들어있는 리스트여야 합니다.")
 
+    # 모든 단계의 조합을 arity 내림차순으로 미리 발행 (스레드 풀은 FIFO이므로 높은 arity가 먼저 실행됨)
+    stage_futures = {
+        r: [
+            _retrieval_executor.submit(query_openalex, list(combo))
+            for combo in itertools.combinations(ks.keywords, r)
+        ]
+        for r in range(5, 0, -1)
+    }
+
     collected = []
     used_titles = set()
 
-    for r in range(5, 0, -1):
-        # 1) 이 단계의 모든 조합에 대해 API 호출
-        combos = list(itertools.combinations(ks.keywords, r))
-        stage_all = []
-        for combo in combos:
-            papers = query_openalex(list(combo))
-            stage_all.extend(papers)
-
-        # 2) 이 단계 내 중복 제목 제거 (첫 등장 유지)
-        seen_stage = set()
-        stage_unique = []
-        for p in stage_all:
-            if p["title"] not in seen_stage:
-                seen_stage.add(p["title"])
-                stage_unique.append(p)
-
-        # 3) 이전 단계에서 이미 뽑힌 논문 제외
-        stage_new = [p for p in stage_unique if p["title"] not in used_titles]
-
-        remaining = 10 - len(collected)
-        if remaining <= 0:
-            break
-
-        # 4) 수집량 초과 시 무작위 선택
-        if len(stage_new) > remaining:
-            selected = random.sample(stage_new, remaining)
-        else:
-            selected = stage_new
-
-        collected.extend(selected)
-        used_titles.update(p["title"] for p in selected)
-
-        if len(collected) >= 10:
-            break
+    try:
+        for r in range(5, 0, -1):
+            # 1) 이 단계의 모든 조합 결과 수집 (조합 순서 유지)
+            stage_all = []
+            for future in stage_futures[r]:
+                stage_all.extend(future.result())
+
+            # 2) 이 단계 내 중복 제목 제거 (첫 등장 유지)
+            seen_stage = set()
+            stage_unique = []
+            for p in stage_all:
+                if p["title"] not in seen_stage:
+                    seen_stage.add(p["title"])
+                    stage_unique.append(p)
+
+            # 3) 이전 단계에서 이미 뽑힌 논문 제외
+            stage_new = [p for p in stage_unique if p["title"] not in used_titles]
+
+            remaining = _TARGET_PAPERS - len(collected)
+            if remaining <= 0:
+                break
+
+            # 4) 수집량 초과 시 무작위 선택
+            if len(stage_new) > remaining:
+                selected = random.sample(stage_new, remaining)
+            else:
+                selected = stage_new
+
+            collected.extend(selected)
+            used_titles.update(p["title"] for p in selected)
+
+            if len(collected) >= _TARGET_PAPERS:
+                break
+    finally:
+        # 충분히 모였으면 아직 시작되지 않은 낮은 arity 조회는 취소
+        cancelled = sum(
+            future.cancel() for futures in stage_futures.values() for future in futures
+        )
+        if cancelled:
+            logger.info(f"[OpenAlex] 남은 조회 {cancelled}건 취소")
 
     # PaperItem 형태로 변환
     papers: List[PaperItem] = []
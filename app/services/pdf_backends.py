@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import io
+import os
+
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Type, Union
+
+PdfSource = Union[str, bytes, io.BytesIO]
+
+# 배포 환경별 텍스트 추출 백엔드 (pypdf2 | pdfminer | pdfium)
+_DEFAULT_BACKEND = os.getenv("PDF_TEXT_BACKEND", "pypdf2")
+
+
+def _as_stream(source: PdfSource):
+    """경로는 그대로, 바이트는 BytesIO로 (BytesIO는 처음 위치로 되감음)"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    if isinstance(source, io.BytesIO):
+        source.seek(0)
+    return source
+
+
+class PdfTextBackend(ABC):
+    """
+    PDF 텍스트 추출 백엔드 인터페이스.
+    open()으로 얻은 문서 핸들을 page_count()/page_text()에 넘기고 close()로 정리한다.
+    """
+    name = ""
+
+    @abstractmethod
+    def open(self, source: PdfSource) -> Any:
+        ...
+
+    @abstractmethod
+    def page_count(self, doc: Any) -> int:
+        ...
+
+    @abstractmethod
+    def page_text(self, doc: Any, index: int) -> str:
+        ...
+
+    def close(self, doc: Any) -> None:
+        pass
+
+
+class PyPDF2Backend(PdfTextBackend):
+    name = "pypdf2"
+
+    def open(self, source: PdfSource) -> Any:
+        import PyPDF2
+        return PyPDF2.PdfReader(_as_stream(source))
+
+    def page_count(self, doc: Any) -> int:
+        return len(doc.pages)
+
+    def page_text(self, doc: Any, index: int) -> str:
+        return doc.pages[index].extract_text() or ""
+
+
+class PdfminerBackend(PdfTextBackend):
+    """pdfminer.six: 느리지만 레이아웃 기반으로 단어 간격/읽기 순서가 더 정확함"""
+    name = "pdfminer"
+
+    def open(self, source: PdfSource) -> Any:
+        from pdfminer.pdfpage import PDFPage
+        stream = _as_stream(source)
+        fp = open(stream, "rb") if isinstance(stream, str) else stream
+        return {"fp": fp, "pages": list(PDFPage.get_pages(fp)), "owned": isinstance(stream, str)}
+
+    def page_count(self, doc: Any) -> int:
+        return len(doc["pages"])
+
+    def page_text(self, doc: Any, index: int) -> str:
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+
+        output = io.StringIO()
+        rsrcmgr = PDFResourceManager()
+        with TextConverter(rsrcmgr, output, laparams=LAParams()) as device:
+            PDFPageInterpreter(rsrcmgr, device).process_page(doc["pages"][index])
+        return output.getvalue().rstrip("\x0c")
+
+    def close(self, doc: Any) -> None:
+        if doc["owned"]:
+            doc["fp"].close()
+
+
+class PdfiumBackend(PdfTextBackend):
+    """pypdfium2 (PDFium 바인딩): C++ 구현이라 가장 빠름"""
+    name = "pdfium"
+
+    def open(self, source: PdfSource) -> Any:
+        import pypdfium2
+        stream = _as_stream(source)
+        return pypdfium2.PdfDocument(stream)
+
+    def page_count(self, doc: Any) -> int:
+        return len(doc)
+
+    def page_text(self, doc: Any, index: int) -> str:
+        page = doc[index]
+        try:
+            textpage = page.get_textpage()
+            try:
+                return textpage.get_text_bounded()
+            finally:
+                textpage.close()
+        finally:
+            page.close()
+
+    def close(self, doc: Any) -> None:
+        doc.close()
+
+
+BACKENDS: Dict[str, Type[PdfTextBackend]] = {
+    backend.name: backend for backend in (PyPDF2Backend, PdfminerBackend, PdfiumBackend)
+}
+
+
+def get_backend(name: str | None = None) -> PdfTextBackend:
+    """이름(없으면 PDF_TEXT_BACKEND 환경변수)으로 백엔드 인스턴스 생성"""
+    name = (name or _DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 PDF 텍스트 백엔드입니다: {name} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional, Tuple
+
+from app.dtos.pdf_extraction_dto import PdfExtractionResult
+from app.services.pdf_backends import PdfSource, PdfTextBackend, get_backend
+
+# ───── 상수
+_MAX_PAGES          = int(os.getenv("PDF_MAX_PAGES", 0)) or None               # 0이면 전체 페이지
+_STOP_AT_REFERENCES = os.getenv("PDF_STOP_AT_REFERENCES", "true").lower() == "true"
+# 참고문헌 제목이 문서 앞쪽(전체 페이지의 이 비율 이전)에 있으면 자르지 않음 (여러 장으로 된 책/논문집의 장별 참고문헌)
+_REFERENCES_MIN_POSITION = float(os.getenv("PDF_REFERENCES_MIN_POSITION", 0.5))
+_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 40))             # 이 이상이면 프로세스 풀 사용
+_PAGES_PER_TASK     = 16
+_EXTRACT_WORKERS    = int(os.getenv("PDF_EXTRACT_WORKERS", os.cpu_count() or 2))
+
+# 한 줄 전체가 참고문헌 제목인 경우만 인정 (목차의 "References 245" 등은 제외)
+_REFERENCES_RE = re.compile(r"^\s*(references|bibliography|참고\s*문헌)\s*$", re.IGNORECASE | re.MULTILINE)
+# 목차 페이지 판별: 목차 제목이 있거나 점선 뒤 쪽 번호로 끝나는 줄이 여러 개
+_CONTENTS_RE = re.compile(r"^\s*(table\s+of\s+contents|contents|목\s*차)\s*$", re.IGNORECASE | re.MULTILINE)
+_TOC_ENTRY_RE = re.compile(r"(\.{3,}|…+)\s*\d{1,4}\s*$", re.MULTILINE)
+_PAGE_NUMBER_RE = re.compile(r"\s*\d{1,4}\s*(\n|$)")
+_TOC_MIN_ENTRIES = 5
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_disabled = False
+_pool_lock = threading.Lock()     # 여러 크롤링 스레드가 동시에 풀을 만들지 않도록
+
+
+def _disable_pool(reason: str) -> None:
+    """이 프로세스에서는 더 이상 프로세스 풀을 쓰지 않음 (이후 추출은 모두 순차)"""
+    global _pool, _pool_disabled
+    with _pool_lock:
+        _pool_disabled = True
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+    logger.warning(f"[PdfExtraction] 프로세스 풀 비활성화 → 순차 추출: {reason}")
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    워커 프로세스마다 1개의 페이지 추출용 프로세스 풀 (최초 사용 시 생성).
+    Celery prefork 자식처럼 데몬 프로세스는 자식 프로세스를 만들 수 없으므로 None.
+    """
+    global _pool
+    if _pool_disabled:
+        return None
+    if multiprocessing.current_process().daemon:
+        _disable_pool("데몬 프로세스에서는 자식 프로세스를 만들 수 없음")
+        return None
+    with _pool_lock:
+        if _pool_disabled:
+            return None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_EXTRACT_WORKERS)
+        return _pool
+
+
+def _submit(pool: ProcessPoolExecutor, fn, *args):
+    """풀에 작업 제출 (워커 프로세스를 시작하지 못하면 풀을 끄고 예외를 그대로 올림)"""
+    try:
+        return pool.submit(fn, *args)
+    except Exception as e:
+        _disable_pool(str(e))
+        raise
+
+
+def _pool_result(future):
+    """워커 프로세스가 비정상 종료해 풀이 깨지면 버리고 다음 호출에서 새로 생성"""
+    global _pool
+    try:
+        return future.result()
+    except BrokenProcessPool:
+        with _pool_lock:
+            _pool = None
+        raise
+
+
+def extraction_config() -> str:
+    """
+    추출 결과에 영향을 주는 설정 (백엔드, 최대 페이지 수, 참고문헌 중단 위치).
+    텍스트 캐시 키에 포함해 설정이 바뀌면 이전 설정으로 추출한 텍스트를 쓰지 않도록 한다.
+    """
+    references = f"{_REFERENCES_MIN_POSITION:g}" if _STOP_AT_REFERENCES else "off"
+    return f"{get_backend().name}:p{_MAX_PAGES or 0}:r{references}"
+
+
+def _extract_range(backend_name: str, path: str, start: int, end: int) -> List[str]:
+    """프로세스 풀에서 실행: [start, end) 페이지의 텍스트"""
+    backend = get_backend(backend_name)
+    doc = backend.open(path)
+    try:
+        return [backend.page_text(doc, i) for i in range(start, end)]
+    finally:
+        backend.close(doc)
+
+
+def _is_contents_page(text: str) -> bool:
+    return _CONTENTS_RE.search(text) is not None or len(_TOC_ENTRY_RE.findall(text)) >= _TOC_MIN_ENTRIES
+
+
+def _cut_at_references(text: str) -> Tuple[str, bool]:
+    """
+    참고문헌 제목이 나오면 그 앞까지만 남김.
+    목차 페이지의 항목이나 다음 줄이 쪽 번호뿐인 줄은 제목으로 보지 않고, 페이지 안의 마지막 제목에서 자른다.
+    """
+    if _is_contents_page(text):
+        return text, False
+    heading = None
+    for match in _REFERENCES_RE.finditer(text):
+        if _PAGE_NUMBER_RE.match(text, match.end()) is None:
+            heading = match
+    if heading is None:
+        return text, False
+    return text[:heading.start()], True
+
+
+def _references_from(total_pages: int) -> int:
+    """참고문헌에서 자르기 시작하는 페이지 번호 (0부터)"""
+    return int(total_pages * _REFERENCES_MIN_POSITION)
+
+
+def _extract_serial(backend: PdfTextBackend, doc, limit: int, stop_at_references: bool,
+                    references_from: int = 0) -> Tuple[List[str], int, bool]:
+    texts = []
+    for i in range(limit):
+        text = backend.page_text(doc, i)
+        if stop_at_references and i >= references_from:
+            text, found = _cut_at_references(text)
+            if found:
+                texts.append(text)
+                return texts, i + 1, True
+        texts.append(text)
+    return texts, limit, False
+
+
+def _extract_parallel(backend: PdfTextBackend, source: PdfSource, limit: int,
+                      stop_at_references: bool, references_from: int = 0) -> Tuple[List[str], int, bool]:
+    """
+    페이지 구간을 프로세스 풀에 나눠 추출.
+    문서 바이트를 태스크마다 직렬화하지 않도록 태스크별 임시 파일 경로만 전달한다.
+    결과는 앞 구간부터 확인하며 참고문헌이 나오면 나머지 구간은 취소한다.
+    """
+    tmp_path = None
+    if isinstance(source, str):
+        path = source
+    else:
+        data = source if isinstance(source, bytes) else source.getbuffer()
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(data)
+            tmp_path = path = tmp.name
+
+    try:
+        pool = _get_pool()
+        if pool is None:
+            raise RuntimeError("프로세스 풀을 사용할 수 없음")
+        futures = [
+            _submit(pool, _extract_range, backend.name, path, start, min(start + _PAGES_PER_TASK, limit))
+            for start in range(0, limit, _PAGES_PER_TASK)
+        ]
+        texts = []
+        stopped = False
+        for future in futures:
+            if stopped:
+                future.cancel()
+                continue
+            for text in _pool_result(future):
+                if stop_at_references and len(texts) >= references_from:
+                    text, stopped = _cut_at_references(text)
+                texts.append(text)
+                if stopped:
+                    break
+        return texts, len(texts), stopped
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+def extract_text(source: PdfSource, *, max_pages: Optional[int] = _MAX_PAGES,
+                 stop_at_references: bool = _STOP_AT_REFERENCES,
+                 backend: Optional[PdfTextBackend] = None,
+                 allow_parallel: bool = True) -> PdfExtractionResult:
+    """
+    PDF 텍스트 추출 (backend가 없으면 PDF_TEXT_BACKEND 환경변수의 백엔드 사용).
+    - max_pages: 앞에서부터 N페이지까지만 추출 (None이면 전체)
+    - stop_at_references: 문서 뒷부분(_REFERENCES_MIN_POSITION 이후)에서 참고문헌 제목이 나오면 추출 중단
+    긴 문서(_PARALLEL_MIN_PAGES 이상)는 페이지 구간을 프로세스 풀에서 병렬 추출한다.
+    """
+    started = time.perf_counter()
+    backend = backend or get_backend()
+    doc = backend.open(source)
+    try:
+        total_pages = backend.page_count(doc)
+        limit = min(total_pages, max_pages) if max_pages else total_pages
+        references_from = _references_from(total_pages)
+
+        parallel = (allow_parallel and limit >= _PARALLEL_MIN_PAGES and _EXTRACT_WORKERS > 1
+                    and _get_pool() is not None)
+        if parallel:
+            try:
+                texts, pages_parsed, stopped = _extract_parallel(backend, source, limit, stop_at_references,
+                                                                 references_from)
+            except Exception as e:
+                # 풀을 쓸 수 없게 됐거나 병렬 추출 중 실패하면 순차 추출
+                logger.warning(f"[PdfExtraction] 병렬 추출 실패 → 순차 추출: {e}")
+                parallel = False
+        if not parallel:
+            texts, pages_parsed, stopped = _extract_serial(backend, doc, limit, stop_at_references, references_from)
+    finally:
+        backend.close(doc)
+
+    result = PdfExtractionResult(
+        text="\n".join(t for t in texts if t),
+        pages_parsed=pages_parsed,
+        total_pages=total_pages,
+        elapsed=time.perf_counter() - started,
+        stopped_at_references=stopped,
+        parallel=parallel,
+    )
+    logger.info(
+        f"[PdfExtraction] {backend.name}: {result.pages_parsed}/{result.total_pages}페이지 추출, "
+        f"{result.elapsed:.2f}초 (병렬={result.parallel}, 참고문헌에서 중단={result.stopped_at_references})"
+    )
+    return result
+
+
+def _extract_document(backend_name: str, data: bytes) -> PdfExtractionResult:
+    """프로세스 풀에서 실행: 문서 1개 전체 추출 (풀 안에서 다시 풀을 만들지 않도록 순차 추출)"""
+    return extract_text(data, backend=get_backend(backend_name), allow_parallel=False)
+
+
+def extract_text_offloaded(source: PdfSource) -> PdfExtractionResult:
+    """
+    호출 스레드를 막지 않도록 문서 1개의 추출을 프로세스 풀에 맡김.
+    여러 다운로드를 스레드로 동시에 진행할 때 파싱(CPU)이 GIL을 잡고 있지 않게 한다.
+    긴 문서는 기존처럼 페이지 구간 병렬 추출을 사용하고, 풀을 쓸 수 없으면 현재 프로세스에서 추출한다.
+    """
+    if isinstance(source, str) or _EXTRACT_WORKERS <= 1 or _get_pool() is None:
+        return extract_text(source)
+    data = source if isinstance(source, bytes) else source.getvalue()
+    backend = get_backend()
+    try:
+        doc = backend.open(data)
+        try:
+            long_document = backend.page_count(doc) >= _PARALLEL_MIN_PAGES
+        finally:
+            backend.close(doc)
+        if long_document:
+            return extract_text(data, backend=backend)
+        pool = _get_pool()
+        if pool is None:
+            return extract_text(data, backend=backend)
+        return _pool_result(_submit(pool, _extract_document, backend.name, data))
+    except Exception as e:
+        logger.warning(f"[PdfExtraction] 프로세스 풀 추출 실패 → 현재 프로세스에서 추출: {e}")
+        return extract_text(data, backend=backend)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import zlib
+
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from app.services.pdf_extraction import extraction_config
+from app.services.response_cache import create_cache
+
+# ───── 상수
+_TTL            = int(os.getenv("PDF_TEXT_CACHE_TTL", 30 * 86400))
+_MAX_BYTES      = int(os.getenv("PDF_TEXT_CACHE_MAX_BYTES", 512 * 1024 * 1024))   # 압축 후 기준
+_COMPRESS_LEVEL = 6
+_DEFAULT_PORTS  = {"http": 80, "https": 443}
+
+logger = logging.getLogger(__name__)
+
+# 추출된 본문 텍스트 캐시 (회의 간 공유)
+# 모든 키 앞에 추출 설정({설정} = 백엔드:최대 페이지:참고문헌 중단)을 붙여 설정 변경 후에는 새로 추출한다.
+# - {설정}:url:{정규화 URL}         → 본문 키 (포인터)
+# - {설정}:sha256:{PDF 바이트 해시} → 압축된 본문 텍스트
+# - {설정}:text:{텍스트 해시}       → 압축된 본문 텍스트 (셀레니움 경로처럼 원본 바이트가 없는 경우)
+text_cache = create_cache("pdf_text", _TTL, max_bytes=_MAX_BYTES)
+
+
+def normalize_pdf_url(url: str) -> str:
+    """스킴/호스트 소문자화, 기본 포트/fragment/utm_* 파라미터 제거, 쿼리 정렬"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def content_key(pdf_bytes) -> str:
+    """PDF 원본 바이트(bytes 또는 memoryview)의 해시 키"""
+    return f"{extraction_config()}:sha256:{hashlib.sha256(pdf_bytes).hexdigest()}"
+
+
+def _get(key: str) -> Optional[bytes]:
+    try:
+        return text_cache.get(key)
+    except Exception as e:
+        logger.warning(f"[PdfTextCache] 조회 실패: {e}")
+        return None
+
+
+def _set(key: str, value: bytes) -> None:
+    try:
+        text_cache.set(key, value)
+    except Exception as e:
+        logger.warning(f"[PdfTextCache] 저장 실패: {e}")
+
+
+def get_by_content(key: str) -> Optional[str]:
+    """본문 키로 텍스트 조회 (압축 해제)"""
+    value = _get(key)
+    return zlib.decompress(value).decode("utf-8") if value is not None else None
+
+
+def get_by_url(url: str) -> Optional[str]:
+    """URL로 텍스트 조회. 적중 시 다운로드와 파싱을 모두 생략할 수 있다"""
+    pointer = _get(f"{extraction_config()}:url:{normalize_pdf_url(url)}")
+    if pointer is None:
+        return None
+    return get_by_content(pointer.decode("utf-8"))
+
+
+def put(url: str, text: str, key: Optional[str] = None) -> None:
+    """
+    추출된 텍스트를 압축 저장하고 URL → 본문 키 포인터를 기록.
+    key(PDF 바이트 해시)가 없으면 텍스트 해시를 본문 키로 사용.
+    """
+    if not text:
+        return
+    data = text.encode("utf-8")
+    key = key or f"{extraction_config()}:text:{hashlib.sha256(data).hexdigest()}"
+    _set(key, zlib.compress(data, _COMPRESS_LEVEL))
+    _set(f"{extraction_config()}:url:{normalize_pdf_url(url)}", key.encode("utf-8"))
+
+
+def stats() -> Dict[str, Any]:
+    """적중률 등 캐시 지표 (URL 포인터 + 본문 조회를 합산)"""
+    return text_cache.stats()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import re
+
+from typing import List, Tuple
+
+from app.services.openalex_service import fetch_works, extract_pdf_urls
+
+# ───── 상수
+_PLANNER_PER_PAGE   = 100   # 기본 쿼리 1회당 가져올 결과 수 (OpenAlex 최대 200)
+_PLANNER_PAGES      = 2     # 기본 쿼리 페이지 수 = 회의당 OpenAlex 호출 수
+_MAX_CANDIDATES     = 40    # 페이지당 PDF 검증을 수행할 최대 후보 수
+_MIN_COMBO_SIZE     = 2
+_SELECT_PART        = "display_name,primary_location,abstract_inverted_index"
+
+logger = logging.getLogger(__name__)
+
+
+# ───── 쿼리 계획
+def build_base_query(keywords: List[str]) -> str:
+    """
+    모든 키워드를 OR로 묶은 기본 쿼리 (조합별 검색 결과의 합집합을 한 번에 가져옴)
+    여러 단어로 된 키워드가 OR 우선순위에 따라 쪼개지지 않도록 각 키워드를 따옴표로 감싼다.
+    """
+    quoted = ['"' + kw.replace('"', '') + '"' for kw in keywords]
+    return " OR ".join(quoted)
+
+
+def plan_queries(keywords: List[str], pages: int = _PLANNER_PAGES) -> List[int]:
+    """
+    회의 1건에 필요한 OpenAlex 호출 계획.
+    키워드 조합마다 검색하는 대신 기본 쿼리 1개를 페이지 단위로 나눠 가져온다.
+    페이지끼리는 결과가 겹치지 않으므로 map 태스크 간 중복 집계가 없다.
+    """
+    if len(keywords) < _MIN_COMBO_SIZE:
+        return []
+    return list(range(1, pages + 1))
+
+
+# ───── 로컬 조합 매칭
+def _abstract_text(inverted_index: dict) -> str:
+    """abstract_inverted_index(단어 → 위치 목록)를 위치 순서대로 이어 초록 원문을 복원"""
+    positions = [
+        (pos, word)
+        for word, word_positions in inverted_index.items()
+        for pos in word_positions
+    ]
+    return " ".join(word for _, word in sorted(positions))
+
+
+def _work_text(work: dict) -> str:
+    """제목 + 초록 (여러 단어 키워드를 구문으로 매칭할 수 있도록 위치 순서대로 복원)"""
+    title = work.get("display_name") or ""
+    abstract = _abstract_text(work.get("abstract_inverted_index") or {})
+    return f"{title}\n{abstract}".lower()
+
+
+def match_combos(text: str, keywords: List[str]) -> List[Tuple[str, ...]]:
+    """
+    논문 텍스트에 모든 키워드가 등장하는 2~5개 키워드 조합 목록.
+    단어 경계 + 접두 매칭 (network → networks 허용), 여러 단어 키워드는 연속된 구문으로 매칭
+    """
+    matched = [
+        kw for kw in keywords
+        if re.search(r"\b" + r"\s+".join(map(re.escape, kw.lower().split())), text)
+    ]
+    combos = []
+    for r in range(_MIN_COMBO_SIZE, len(matched) + 1):
+        combos.extend(itertools.combinations(matched, r))
+    return combos
+
+
+def query_planned(keywords: List[str], page: int) -> List[dict]:
+    """
+    기본 쿼리의 한 페이지를 가져와 각 논문이 어떤 키워드 조합에 해당하는지 로컬에서 계산.
+    hits(매칭된 조합 수)는 조합별 검색 시 해당 논문이 등장했을 횟수에 대응하며
+    reduce 단계의 빈도 집계에 그대로 사용된다.
+    """
+    works = fetch_works(
+        build_base_query(keywords),
+        per_page=_PLANNER_PER_PAGE,
+        page=page,
+        select=_SELECT_PART,
+    )
+
+    candidates = []
+    offset = (page - 1) * _PLANNER_PER_PAGE
+    for rank, work in enumerate(works, start=offset + 1):
+        title = work.get("display_name")
+        if not title:
+            continue
+        combos = match_combos(_work_text(work), keywords)
+        if combos:
+            candidates.append((rank, title.strip(), combos, work))
+
+    # 많이 매칭된 논문부터 PDF 검증 (검증 HTTP 호출 수 제한)
+    candidates.sort(key=lambda c: (-len(c[2]), c[0]))
+    candidates = candidates[:_MAX_CANDIDATES]
+    pdf_urls = extract_pdf_urls([work for _, _, _, work in candidates])
+    results = []
+    for (rank, title, combos, _), pdf_url in zip(candidates, pdf_urls):
+        if pdf_url:
+            results.append({
+                "rank": rank,
+                "title": title,
+                "pdf": pdf_url,
+                "combos": [list(c) for c in combos],
+                "hits": len(combos),
+            })
+
+    logger.info(f"[Planner] page={page} 결과 {len(works)}개 중 후보 {len(results)}개")
+    return results
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+
+import redis
+
+# ───── 상수
+_REDIS_DB = 5                       # 호스트 상태(host_health)와 같은 DB
+_KEY_TTL  = 60
+
+logger = logging.getLogger(__name__)
+
+# 토큰 수/갱신 시각을 Redis 서버 시각 기준으로 원자적으로 갱신하고, 토큰이 모자라면 대기할 시간(초)을 반환
+_ACQUIRE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local tokens_needed = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local h = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(h[1] or capacity)
+local updated = tonumber(h[2] or now)
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= tokens_needed then
+    tokens = tokens - tokens_needed
+else
+    wait = (tokens_needed - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return tostring(wait)
+"""
+
+
+class TokenBucket:
+    """
+    스레드 안전 토큰 버킷.
+    초당 rate개씩 토큰이 채워지고 최대 capacity개까지 쌓인다 (순간 burst 허용량).
+    """
+
+    def __init__(self, rate: float, capacity: int | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: int = 1) -> None:
+        """토큰을 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class RedisTokenBucket:
+    """
+    Redis에 상태를 둔 토큰 버킷 (같은 name을 쓰는 모든 프로세스가 한도를 공유).
+    Celery prefork처럼 여러 워커 프로세스가 같은 외부 API를 호출해도 합산 요청 수가 rate를 넘지 않는다.
+    Redis 장애 시에는 프로세스 단위 TokenBucket으로 대체한다.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: int | None = None, client: redis.Redis | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1, int(rate))
+        self._key = f"rate_limit:{name}"
+        self._client = client or redis.Redis(host="localhost", port=6379, db=_REDIS_DB)
+        self._script = self._client.register_script(_ACQUIRE_SCRIPT)
+        self._fallback = TokenBucket(rate, self.capacity)
+
+    def acquire(self, tokens: int = 1) -> None:
+        """토큰을 얻을 때까지 대기"""
+        while True:
+            try:
+                wait = float(self._script(keys=[self._key], args=[self.rate, self.capacity, tokens, _KEY_TTL]))
+            except redis.RedisError as e:
+                logger.warning(f"[RateLimiter] Redis 사용 불가 → 프로세스 단위 제한: {e}")
+                self._fallback.acquire(tokens)
+                return
+            if wait <= 0:
+                return
+            time.sleep(wait)
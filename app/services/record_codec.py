@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import zlib
+
+from typing import Any, Dict
+
+import msgpack
+
+# ───── 상수
+# 봉투(envelope) 첫 바이트: 상위 4비트 = 포맷 버전, 하위 4비트 = 플래그
+_VERSION        = 1
+_FLAG_ZLIB      = 0x01
+_COMPRESS_MIN   = 512          # 이보다 작은 페이로드는 압축 이득이 없어 그대로 저장
+_COMPRESS_LEVEL = 6
+
+# Redis에 저장되는 레코드 형식
+# - 메타데이터 레코드 (relevance:{meeting_id}:candidates 등): 봉투 + msgpack(dict)
+# - 본문 블롭 (document_store): 봉투 + UTF-8 텍스트
+# 메타데이터에는 본문을 넣지 않고 doc_id로만 참조해, 점수 계산 전 단계에서 본문을 읽지 않도록 한다.
+
+
+def _seal(payload: bytes) -> bytes:
+    flags = 0
+    if len(payload) >= _COMPRESS_MIN:
+        payload = zlib.compress(payload, _COMPRESS_LEVEL)
+        flags |= _FLAG_ZLIB
+    return bytes(((_VERSION << 4) | flags,)) + payload
+
+
+def _open(data) -> memoryview:
+    """봉투를 풀어 페이로드 반환 (bytes / memoryview / mmap 모두 복사 없이 슬라이스)"""
+    view = memoryview(data)
+    if not view:
+        raise ValueError("빈 레코드입니다")
+    header = view[0]
+    if header >> 4 != _VERSION:
+        raise ValueError(f"지원하지 않는 레코드 버전입니다: {header >> 4}")
+    payload = view[1:]
+    if header & _FLAG_ZLIB:
+        return memoryview(zlib.decompress(payload))
+    return payload
+
+
+def pack_record(record: Dict[str, Any]) -> bytes:
+    return _seal(msgpack.packb(record, use_bin_type=True))
+
+
+def unpack_record(data) -> Dict[str, Any]:
+    return msgpack.unpackb(_open(data), raw=False)
+
+
+def pack_text(text: str) -> bytes:
+    return _seal(text.encode("utf-8"))
+
+
+def unpack_text(data) -> str:
+    return str(_open(data), "utf-8")
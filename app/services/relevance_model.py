@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+import redis
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+from app.services.record_codec import pack_record, unpack_record
+
+# ───── 상수
+_N_FEATURES  = 2 ** 20
+_REDIS_DB    = 3
+_VECTOR_TTL  = int(os.getenv("RELEVANCE_VECTOR_TTL", 86400))
+_CHUNK_SIZE  = int(os.getenv("RELEVANCE_CHUNK_SIZE", 2000))     # 청크 단위 점수 계산 시 청크 길이 (문자)
+_CHUNK_TOP_K = int(os.getenv("RELEVANCE_CHUNK_TOP_K", 3))       # pooling="topk"일 때 평균낼 상위 청크 수
+_EXECUTORS   = ("serial", "process", "shared")
+_EXECUTOR    = os.getenv("RELEVANCE_EXECUTOR", "shared")        # 청크 벡터화 실행 전략
+_BATCH_CHARS = int(os.getenv("RELEVANCE_BATCH_CHARS", 200_000))  # serial/process 배치 1개의 최대 문자 수
+_SCORE_WORKERS = int(os.getenv("RELEVANCE_SCORE_WORKERS", os.cpu_count() or 2))
+
+logger = logging.getLogger(__name__)
+
+redis_client = redis.Redis(host="localhost", port=6379, db=_REDIS_DB)
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_disabled = False
+
+# Redis 키 구성 (코퍼스 전체 IDF 모델, 회의 간 공유)
+# - tfidf:n_docs            지금까지 반영된 문서 수
+# - tfidf:df                해시 특성 index → 문서 빈도 (hash)
+# - tfidf:docs              df에 반영된 doc_id (set, 같은 본문은 한 번만 반영)
+# - tfidf:vec:{doc_id}      도착 시점 IDF로 계산한 L2 정규화 TF-IDF 벡터 (record_codec 봉투)
+# 회의록 벡터는 회의 컨텍스트(meeting_context)에 회의당 1회 계산해 저장한다.
+# 논문 벡터는 도착 시점의 IDF로 한 번만 계산한다. 코퍼스가 충분히 크면 논문 몇 편으로 IDF가
+# 거의 변하지 않으므로, 같은 회의 안의 점수는 배치와 관계없이 같은 척도로 비교할 수 있다.
+# 청크 단위 점수(score_chunks)는 문서 빈도를 그대로 쓰고(청크는 df에 반영하지 않음),
+# 주어진 논문들의 청크를 한 번에 벡터화해 회의록과의 코사인을 청크별로 구한 뒤 논문별로 모은다.
+# relevance_worker는 논문이 도착할 때마다 1편씩 호출한다 (여러 편을 묶는 경로는 벤치마크용).
+
+# 어휘 사전 없이 특성 index가 고정되므로 워커 간에 같은 벡터 공간을 공유할 수 있음
+_vectorizer = HashingVectorizer(
+    n_features=_N_FEATURES,
+    stop_words="english",
+    alternate_sign=False,
+    norm=None,
+)
+
+
+def _count_chunks(chunks: List[str]) -> sparse.csr_matrix:
+    """청크 목록의 단어 빈도 행렬 (프로세스 풀에서도 실행되므로 Redis를 쓰지 않음)"""
+    counts = _vectorizer.transform(chunks)
+    counts.sum_duplicates()
+    return counts
+
+
+def _term_counts(text: str) -> sparse.csr_matrix:
+    return _count_chunks([text])
+
+
+def chunk_text(text: str, chunk_size: int = _CHUNK_SIZE) -> List[str]:
+    """텍스트를 청크 단위로 분할"""
+    return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+
+def _idf(features: np.ndarray) -> np.ndarray:
+    """smooth idf (sklearn TfidfVectorizer와 동일): ln((1 + n) / (1 + df)) + 1"""
+    n_docs = int(redis_client.get("tfidf:n_docs") or 0)
+    df = redis_client.hmget("tfidf:df", features.tolist()) if len(features) else []
+    df = np.array([int(v or 0) for v in df], dtype=np.float64)
+    return np.log((1 + n_docs) / (1 + df)) + 1
+
+
+def _weighted(counts: sparse.csr_matrix) -> Dict[str, np.ndarray]:
+    """sublinear tf × idf 후 L2 정규화 (0 벡터면 빈 벡터)"""
+    features = counts.indices.astype(np.int32)
+    weights = (1 + np.log(counts.data)) * _idf(features)
+    norm = np.linalg.norm(weights)
+    if norm == 0:
+        return {"i": np.empty(0, dtype=np.int32), "d": np.empty(0, dtype=np.float32)}
+    return {"i": features, "d": (weights / norm).astype(np.float32)}
+
+
+def pack_vector(vector: Dict[str, np.ndarray]) -> bytes:
+    return pack_record({"i": vector["i"].tobytes(), "d": vector["d"].tobytes()})
+
+
+def unpack_vector(data) -> Dict[str, np.ndarray]:
+    record = unpack_record(data)
+    return {"i": np.frombuffer(record["i"], dtype=np.int32), "d": np.frombuffer(record["d"], dtype=np.float32)}
+
+
+def add_document(doc_id: str, text: str) -> None:
+    """
+    논문이 도착했을 때 1회 호출.
+    처음 보는 본문이면 문서 빈도를 갱신하고, 현재 IDF로 벡터를 계산해 저장한다.
+    (이미 벡터가 있으면 만료 시각만 연장)
+    """
+    vec_key = f"tfidf:vec:{doc_id}"
+    if redis_client.expire(vec_key, _VECTOR_TTL):
+        return
+    counts = _term_counts(text)
+    if redis_client.sadd("tfidf:docs", doc_id):
+        pipe = redis_client.pipeline(transaction=False)
+        pipe.incr("tfidf:n_docs")
+        for feature in counts.indices.tolist():
+            pipe.hincrby("tfidf:df", feature, 1)
+        pipe.execute()
+    redis_client.set(vec_key, pack_vector(_weighted(counts)), ex=_VECTOR_TTL)
+
+
+def query_vector(text: str) -> Dict[str, np.ndarray]:
+    """회의록 등 질의 텍스트의 벡터 (코퍼스 df에는 반영하지 않음)"""
+    return _weighted(_term_counts(text))
+
+
+def _dot(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray]) -> float:
+    _, ia, ib = np.intersect1d(a["i"], b["i"], assume_unique=True, return_indices=True)
+    return float(np.dot(a["d"][ia].astype(np.float64), b["d"][ib]))
+
+
+def get_vectors(doc_ids: Iterable[str]) -> Dict[str, Optional[Dict[str, np.ndarray]]]:
+    """저장된 논문 TF-IDF 벡터 조회 (만료/미등록 문서는 None)"""
+    doc_ids = list(dict.fromkeys(doc_ids))
+    if not doc_ids:
+        return {}
+    blobs = redis_client.mget([f"tfidf:vec:{doc_id}" for doc_id in doc_ids])
+    return {doc_id: unpack_vector(blob) if blob is not None else None for doc_id, blob in zip(doc_ids, blobs)}
+
+
+def score_documents(query: Dict[str, np.ndarray], doc_ids: Iterable[str]) -> Dict[str, Optional[float]]:
+    """
+    질의(회의록) 벡터와 각 논문의 코사인 유사도 (두 벡터 모두 정규화되어 있어 내적과 같음).
+    저장된 벡터가 없는 문서(만료 등)는 None.
+    """
+    return {
+        doc_id: _dot(query, vector) if vector is not None else None
+        for doc_id, vector in get_vectors(doc_ids).items()
+    }
+
+
+def _weighted_rows(counts: sparse.csr_matrix) -> sparse.csr_matrix:
+    """행(청크)마다 sublinear tf × idf 후 L2 정규화 (IDF는 전체 행의 특성을 모아 한 번만 조회)"""
+    features, inverse = np.unique(counts.indices, return_inverse=True)
+    weighted = counts.astype(np.float64)
+    weighted.data = (1 + np.log(weighted.data)) * _idf(features.astype(np.int32))[inverse]
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1 / norms) @ weighted
+
+
+def _chunk_batches(chunks: List[str], max_chars: int) -> List[List[str]]:
+    """문자 수 합이 max_chars를 넘지 않도록 청크를 순서대로 묶음 (긴 논문은 여러 배치로 나뉨)"""
+    batches, batch, size = [], [], 0
+    for chunk in chunks:
+        if batch and size + len(chunk) > max_chars:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(chunk)
+        size += len(chunk)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _disable_pool(reason: str) -> None:
+    """이 프로세스에서는 더 이상 프로세스 풀을 쓰지 않음 (이후 벡터화는 serial)"""
+    global _pool, _pool_disabled
+    _pool_disabled = True
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+    logger.warning(f"[Relevance] 벡터화 프로세스 풀 비활성화 → serial: {reason}")
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    워커 프로세스마다 1개의 벡터화용 프로세스 풀 (최초 사용 시 생성).
+    Celery prefork 자식처럼 데몬 프로세스는 자식 프로세스를 만들 수 없으므로 None.
+    """
+    global _pool
+    if _pool_disabled:
+        return None
+    if multiprocessing.current_process().daemon:
+        _disable_pool("데몬 프로세스에서는 자식 프로세스를 만들 수 없음")
+        return None
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=_SCORE_WORKERS)
+    return _pool
+
+
+def _vectorize_chunks(chunks: List[str], executor: str) -> sparse.csr_matrix:
+    """
+    청크 벡터화 실행 전략 (토큰화는 순수 파이썬 정규식이라 스레드로는 GIL에 막혀 병렬화되지 않음)
+    - shared  : 모든 청크를 한 번에 벡터화 (호출 프로세스, 가장 적은 오버헤드)
+    - serial  : 크기 기준 배치로 나눠 순서대로 벡터화 (호출 프로세스, 최대 메모리 제한)
+    - process : 크기 기준 배치를 프로세스 풀에 나눠 병렬 벡터화 (긴 본문이 많을 때)
+                풀을 쓸 수 없는 환경(데몬 프로세스)이거나 풀 실행이 실패하면 serial로 대체
+    어느 전략이든 결과 행렬은 청크 순서가 같아, 이후 IDF 조회/행렬 곱은 한 번만 수행한다.
+    """
+    if executor == "shared":
+        return _count_chunks(chunks)
+    batches = _chunk_batches(chunks, _BATCH_CHARS)
+    parts = None
+    pool = _get_pool() if executor == "process" and len(batches) > 1 else None
+    if pool is not None:
+        try:
+            parts = list(pool.map(_count_chunks, batches))
+        except Exception as e:
+            _disable_pool(str(e))
+    if parts is None:
+        parts = [_count_chunks(batch) for batch in batches]
+    return sparse.vstack(parts, format="csr")
+
+
+def score_chunks(
+    query: Dict[str, np.ndarray],
+    texts: Mapping[str, str],
+    pooling: str = "max",
+    top_k: int = _CHUNK_TOP_K,
+    executor: str = _EXECUTOR,
+) -> Dict[str, float]:
+    """
+    청크 단위 유사도. 모든 후보 논문의 청크를 희소 행렬 하나로 벡터화하고,
+    회의록 벡터와의 코사인을 희소 행렬 곱 한 번으로 구한 뒤 논문별로 집계한다.
+    - pooling="max"  : 가장 관련 있는 청크의 점수 (긴 논문에서 관련 절이 희석되지 않음)
+    - pooling="topk" : 상위 top_k개 청크 점수의 평균 (청크 하나만 우연히 겹치는 경우 완화)
+    - executor       : 벡터화 실행 전략 (_vectorize_chunks 참고)
+    본문이 비어 있는 논문은 0.0.
+    """
+    if pooling not in ("max", "topk"):
+        raise ValueError(f"지원하지 않는 pooling입니다: {pooling}")
+    if executor not in _EXECUTORS:
+        raise ValueError(f"지원하지 않는 executor입니다: {executor}")
+    doc_ids, chunks, offsets = [], [], []
+    for doc_id, text in texts.items():
+        parts = chunk_text(text or "")
+        if parts:
+            doc_ids.append(doc_id)
+            offsets.append(len(chunks))
+            chunks.extend(parts)
+    scores = {doc_id: 0.0 for doc_id in texts}
+    if not chunks or not len(query["i"]):
+        return scores
+
+    matrix = _weighted_rows(_vectorize_chunks(chunks, executor))
+    query_column = sparse.csr_matrix(
+        (query["d"].astype(np.float64), query["i"], np.array([0, len(query["i"])])),
+        shape=(1, _N_FEATURES),
+    ).T
+    similarities = (matrix @ query_column).toarray().ravel()
+
+    if pooling == "max":
+        pooled = np.maximum.reduceat(similarities, offsets)
+    else:
+        pooled = [
+            float(np.sort(segment)[-top_k:].mean())
+            for segment in np.split(similarities, offsets[1:])
+        ]
+    scores.update(zip(doc_ids, map(float, pooled)))
+    return scores
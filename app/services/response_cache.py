@@ -0,0 +1,293 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import threading
+import time
+
+from typing import Any, Dict, Optional
+
+import redis
+
+# ───── 상수
+_BACKEND        = os.getenv("CACHE_BACKEND", "redis")       # redis | disk | none
+_CACHE_DIR      = os.getenv("CACHE_DIR", "./cache")
+_REDIS_DB       = 4
+_EXPIRY_HEADER  = struct.Struct("!d")                        # 디스크 캐시 파일 앞부분: 만료 시각
+
+logger = logging.getLogger(__name__)
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+# 값 저장 + 예산 초과 항목 제거를 원자적으로 처리
+# KEYS: lru, sizes, bytes / ARGV: digest, value, ttl, now, max_entries(0=무제한), max_bytes(0=무제한), 값 키 접두사
+# 전체 바이트 수는 카운터(bytes)로 유지해 저장할 때마다 크기 목록 전체를 읽지 않는다.
+_SET_SCRIPT = """
+local old = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+redis.call('SET', ARGV[7] .. ARGV[1], ARGV[2], 'EX', ARGV[3])
+redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], string.len(ARGV[2]))
+local total = redis.call('INCRBY', KEYS[3], string.len(ARGV[2]) - old)
+local max_entries = tonumber(ARGV[5])
+local max_bytes = tonumber(ARGV[6])
+while (max_entries > 0 and redis.call('ZCARD', KEYS[1]) > max_entries) or (max_bytes > 0 and total > max_bytes) do
+    local popped = redis.call('ZPOPMIN', KEYS[1])
+    if #popped == 0 then
+        break
+    end
+    local size = tonumber(redis.call('HGET', KEYS[2], popped[1]) or '0')
+    redis.call('HDEL', KEYS[2], popped[1])
+    redis.call('DEL', ARGV[7] .. popped[1])
+    total = redis.call('DECRBY', KEYS[3], size)
+end
+return total
+"""
+
+# 항목 제거 (삭제 또는 만료 확인 시) + 바이트 카운터 차감
+# KEYS: lru, sizes, bytes / ARGV: digest, 값 키 접두사
+_FORGET_SCRIPT = """
+local size = tonumber(redis.call('HGET', KEYS[2], ARGV[1]) or '0')
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('DEL', ARGV[2] .. ARGV[1])
+if size > 0 then
+    redis.call('DECRBY', KEYS[3], size)
+end
+return size
+"""
+
+
+class RedisCache:
+    """
+    Redis 기반 TTL + LRU 캐시.
+    - cache:{ns}:v:{digest}  값 (EX=ttl)
+    - cache:{ns}:lru         digest → 마지막 접근 시각 (sorted set, 가장 오래된 것부터 제거)
+    - cache:{ns}:sizes       digest → 값 크기
+    - cache:{ns}:bytes       전체 값 크기 합 (바이트 예산 계산용 카운터)
+    - cache:{ns}:hits/misses 적중/미스 카운터
+    """
+
+    def __init__(self, namespace: str, ttl: int, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, client: Optional[redis.Redis] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.client = client or redis.Redis(host="localhost", port=6379, db=_REDIS_DB)
+        self._prefix = f"cache:{namespace}"
+        self._bookkeeping_keys = [f"{self._prefix}:lru", f"{self._prefix}:sizes", f"{self._prefix}:bytes"]
+        self._set_script = self.client.register_script(_SET_SCRIPT)
+        self._forget_script = self.client.register_script(_FORGET_SCRIPT)
+
+    def _value_key(self, digest: str) -> str:
+        return f"{self._prefix}:v:{digest}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        digest = _digest(key)
+        value = self.client.get(self._value_key(digest))
+        if value is None:
+            self.client.incr(f"{self._prefix}:misses")
+            # 만료된 항목은 LRU 목록/바이트 합계에서도 제거
+            self._forget_script(keys=self._bookkeeping_keys, args=[digest, f"{self._prefix}:v:"])
+        else:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incr(f"{self._prefix}:hits")
+            pipe.zadd(f"{self._prefix}:lru", {digest: time.time()})
+            pipe.execute()
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        """저장 후 항목 수/바이트 예산을 넘으면 가장 오래 접근하지 않은 항목부터 제거"""
+        self._set_script(
+            keys=self._bookkeeping_keys,
+            args=[_digest(key), value, self.ttl, time.time(),
+                  self.max_entries or 0, self.max_bytes or 0, f"{self._prefix}:v:"],
+        )
+
+    def delete(self, key: str) -> None:
+        self._forget_script(keys=self._bookkeeping_keys, args=[_digest(key), f"{self._prefix}:v:"])
+
+    def stats(self) -> Dict[str, Any]:
+        hits = int(self.client.get(f"{self._prefix}:hits") or 0)
+        misses = int(self.client.get(f"{self._prefix}:misses") or 0)
+        return {
+            "backend": "redis",
+            "namespace": self.namespace,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": self.client.zcard(f"{self._prefix}:lru"),
+            "bytes": int(self.client.get(f"{self._prefix}:bytes") or 0),
+        }
+
+
+class DiskCache:
+    """
+    로컬 디렉토리 기반 TTL + LRU 캐시.
+    파일 앞 8바이트에 만료 시각을 기록하고, 파일 mtime을 마지막 접근 시각으로 사용한다.
+    적중/미스 카운터는 프로세스 단위로 집계된다.
+    """
+
+    def __init__(self, namespace: str, ttl: int, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, cache_dir: str = _CACHE_DIR):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = os.path.abspath(os.path.join(cache_dir, namespace))
+        os.makedirs(self.directory, exist_ok=True)
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{_digest(key)}.bin")
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                (expires_at,) = _EXPIRY_HEADER.unpack(f.read(_EXPIRY_HEADER.size))
+                if expires_at < time.time():
+                    value = None
+                else:
+                    value = f.read()
+        except (OSError, struct.error):
+            value = None
+            expires_at = None
+
+        if value is None:
+            if expires_at is not None:
+                self._remove(path)
+            self._count(hit=False)
+            return None
+
+        # 접근 시각 갱신 (LRU)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count(hit=True)
+        return value
+
+    def set(self, key: str, value: bytes) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_EXPIRY_HEADER.pack(time.time() + self.ttl))
+            f.write(value)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def delete(self, key: str) -> None:
+        self._remove(self._path(key))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".bin"):
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        """항목 수/바이트 예산을 넘으면 mtime이 가장 오래된 파일부터 제거"""
+        if self.max_entries is None and self.max_bytes is None:
+            return
+        entries = sorted(self._entries())
+        count = len(entries)
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            over_entries = self.max_entries is not None and count > self.max_entries
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            if not (over_entries or over_bytes):
+                break
+            self._remove(path)
+            count -= 1
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        entries = self._entries()
+        hits, misses = self._hits, self._misses
+        return {
+            "backend": "disk",
+            "namespace": self.namespace,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+
+class NullCache:
+    """캐시 비활성화용 (CACHE_BACKEND=none)"""
+
+    def __init__(self, namespace: str, *args, **kwargs):
+        self.namespace = namespace
+
+    def get(self, key: str) -> Optional[bytes]:
+        return None
+
+    def set(self, key: str, value: bytes) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none", "namespace": self.namespace, "hits": 0, "misses": 0, "hit_rate": 0.0}
+
+
+def create_cache(namespace: str, ttl: int, *, max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None, backend: str = _BACKEND):
+    """CACHE_BACKEND 환경변수(redis | disk | none)에 따라 캐시 인스턴스 생성"""
+    if backend == "redis":
+        return RedisCache(namespace, ttl, max_entries=max_entries, max_bytes=max_bytes)
+    if backend == "disk":
+        return DiskCache(namespace, ttl, max_entries=max_entries, max_bytes=max_bytes)
+    if backend == "none":
+        return NullCache(namespace)
+    raise ValueError(f"지원하지 않는 캐시 백엔드입니다: {backend}")
+
+
+def get_json(cache, key: str) -> Optional[Any]:
+    """캐시에서 JSON 값을 읽는다. 캐시 장애는 미스로 처리"""
+    try:
+        value = cache.get(key)
+    except Exception as e:
+        logger.warning(f"[Cache] {cache.namespace} 조회 실패: {e}")
+        return None
+    return json.loads(value) if value is not None else None
+
+
+def set_json(cache, key: str, value: Any) -> None:
+    """캐시에 JSON 값을 저장한다. 캐시 장애는 무시"""
+    try:
+        cache.set(key, json.dumps(value).encode("utf-8"))
+    except Exception as e:
+        logger.warning(f"[Cache] {cache.namespace} 저장 실패: {e}")
@@ -1,35 +1,28 @@
 from app.celery_app import celery_app
-import pymysql
+from app.services.document_store import document_store
+from app.services.inverted_index_store import create_index_store, index_words
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 워커 프로세스마다 연결 풀을 재사용 (태스크마다 새로 연결하지 않음)
+index_store = create_index_store()
+
 @celery_app.task(name='workers.invertedindex_worker.build_inverted_index', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
-def build_and_save_inverted_index(self, text, meeting_id):
-    logger.info(f"[INVERTED INDEX] 태스크 시작: meeting_id={meeting_id}")
-    # 1. 띄어쓰기 단위로 단어 분리
-    words = text.split()
-    # 2. 모두 소문자로 변환
-    words = [w.lower() for w in words]
-    # 3. 중복 제거 (원하면 set(words) 사용)
-    unique_words = set(words)
-    logger.info(f"[INVERTED INDEX] {len(unique_words)}개 단어 추출 및 중복 제거 완료")
+def build_and_save_inverted_index(self, meeting_id, doc_ids):
+    """
+    relevance_worker가 한 번에 선정한 논문들(doc_id 목록)의 역색인을 한 번에 저장.
+    본문은 문서 저장소에서 읽고, 논문들의 단어를 합쳐 중복 없이 다중 행 INSERT로 기록한다.
+    (같은 회의·단어는 unique key로 무시되므로 재시도/중복 태스크에도 결과가 같음)
+    """
+    logger.info(f"[INVERTED INDEX] 태스크 시작: meeting_id={meeting_id}, 논문 {len(doc_ids)}편")
+    words = set()
+    for doc_id, text in document_store.get_many(doc_ids).items():
+        if text is None:
+            logger.warning(f"[INVERTED INDEX] 본문 없음 (만료) → 건너뜀: doc_id={doc_id}")
+            continue
+        words |= index_words(text)
+    logger.info(f"[INVERTED INDEX] {len(words)}개 단어 추출 및 중복 제거 완료")
 
-    # 4. MySQL에 저장
-    conn = pymysql.connect(
-        host='localhost',
-        user='',
-        password='!',
-        db='ds',
-        charset='utf8mb4'
-    )
-    try:
-        with conn.cursor() as cursor:
-            for word in unique_words:
-                sql = "INSERT INTO inverted_index (paper_word, meeting_id) VALUES (%s, %s)"
-                cursor.execute(sql, (word, meeting_id))
-        conn.commit()
-        logger.info(f"[INVERTED INDEX] DB 저장 완료: {len(unique_words)}개 단어")
-    finally:
-        conn.close()
-        logger.info(f"[INVERTED INDEX] DB 연결 종료")
\ No newline at end of file
+    inserted = index_store.add_words(meeting_id, words)
+    logger.info(f"[INVERTED INDEX] DB 저장 완료: 새 단어 {inserted}개 / {len(words)}개")
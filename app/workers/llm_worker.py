@@ -1,8 +1,8 @@
 from app.celery_app import celery_app
 from app.services.llm_service import summarize_papers
 from app.dtos.crawled_paper_dto import CrawledPaper
+from app.services.document_store import document_store
 import requests
-import os
 import redis
 import json
 import logging
@@ -14,12 +14,13 @@ logger = logging.getLogger('celery.task')
 redis_client = redis.Redis(host='localhost', port=6379, db=0)
 
 @celery_app.task(name='workers.llm_worker.summarize_paper', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
-def summarize_paper(self, title, meeting_id, txt_path, pdf_url):
+def summarize_paper(self, title, meeting_id, doc_id, pdf_url):
     logger.info(f"[LLM Worker] 논문 요약 시작: {title}")
     
     try:
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            text = f.read()
+        text = document_store.get(doc_id)
+        if text is None:
+            raise ValueError(f"문서 저장소에 본문이 없습니다 (만료 또는 미저장): doc_id={doc_id}")
         
         # CrawledPaper 객체 생성
         paper = CrawledPaper(
@@ -59,13 +60,6 @@ def summarize_paper(self, title, meeting_id, txt_path, pdf_url):
         except Exception as e:
             logger.error(f"[LLM Worker] Redis 결과 발행 실패: {str(e)}")
 
-        # txt 파일 삭제
-        try:
-            os.remove(txt_path)
-            logger.info(f"[LLM Worker] txt 파일 삭제 완료: {txt_path}")
-        except Exception as e:
-            logger.error(f"[LLM Worker] txt 파일 삭제 실패: {txt_path}, 에러: {e}")
-        
         logger.info(f"[LLM Worker] 논문 요약 작업 완료: {title}")
         
     except Exception as e:
@@ -1,45 +1,207 @@
 from app.celery_app import celery_app
+from app.services import host_health
+from app.services.http_pool import host_of
 import redis
 import json
 import logging
+import os
+import re
 
 redis_client = redis.Redis(host='localhost', port=6379, db=2)
 logger = logging.getLogger(__name__)
 
-@celery_app.task(name='workers.openalex_reduce_worker.reduce', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
-def reduce_openalex_results(self, task_id, total_map_tasks, meeting_id, meeting_text):
-    logger.info(f"[REDUCE] 태스크 시작: task_id={task_id}, total_map_tasks={total_map_tasks}, meeting_id={meeting_id}")
-    # 모든 map 태스크가 끝났는지 확인
-    while int(redis_client.get(f"openalex:{task_id}:done") or 0) < total_map_tasks:
-        logger.info(f"[REDUCE] map 태스크 완료 대기 중... 현재 완료: {redis_client.get(f'openalex:{task_id}:done')} / {total_map_tasks}")
-        import time; time.sleep(0.5)
-
-    # 모든 논문 결과 집계
-    all_results = []
-    for item in redis_client.lrange(f"openalex:{task_id}", 0, -1):
-        all_results.append(json.loads(item))
-    logger.info(f"[REDUCE] 논문 결과 {len(all_results)}개 집계 완료")
-
-    # 논문별 등장 빈도 집계
-    freq = {}
-    paper_info = {}
-    for paper in all_results:
-        title = paper['title']
-        freq[title] = freq.get(title, 0) + 1
-        paper_info[title] = paper
-
-    # 등장 빈도 기준 상위 20개 논문 후보 추출
-    top_titles = sorted(freq, key=lambda x: -freq[x])[:20]
-    top_papers = [paper_info[title] for title in top_titles]
-    logger.info(f"[REDUCE] 상위 20개 논문 선정: {[p['title'] for p in top_papers]}")
-
-    # PDF 워커에 태스크 발행
-    for paper in top_papers:
+# map 태스크가 끝나지 않아도 partial reduce를 실행할 때까지의 대기 시간 (초)
+_REDUCE_TIMEOUT = int(os.getenv('REDUCE_TIMEOUT', 60))
+# reduce 관련 Redis 키의 만료 시간 (초)
+_KEY_TTL = 3600
+# PDF 워커로 보낼 상위 논문 후보 수
+_TOP_K = 20
+# 호스트 상태로 순위를 조정할 때 함께 살펴볼 후보 수 (차단된 호스트의 논문을 대체)
+_CANDIDATE_POOL = _TOP_K * 2
+# 호스트 건강 점수가 0이어도 빈도 점수에 곱해지는 최소 가중치 (차단 호스트는 별도로 제외)
+_HEALTH_FLOOR = 0.5
+
+# Redis 키 구성
+# - openalex:{task_id}:scores      논문 id → 누적 빈도 (sorted set)
+# - openalex:{task_id}:meta        논문 id → 논문 정보 JSON (hash)
+# - openalex:{task_id}:dispatched  PDF 태스크가 이미 발행된 논문 id (set)
+# - openalex:{task_id}:recorded:{map_id}  결과가 이미 누적된 map 태스크 (재시도 시 중복 집계 방지)
+
+# map 결과 누적을 map 태스크별 1회로 제한 (선점 키 설정과 누적을 원자적으로 처리)
+# ARGV: TTL, 이후 (논문 id, hits, 논문 정보 JSON) 반복. 이미 기록된 map 태스크면 0을 반환한다.
+_RECORD_SCRIPT = redis_client.register_script("""
+if not redis.call('SET', KEYS[1], 1, 'NX', 'EX', ARGV[1]) then
+    return 0
+end
+for i = 2, #ARGV, 3 do
+    redis.call('ZINCRBY', KEYS[2], ARGV[i + 1], ARGV[i])
+    redis.call('HSETNX', KEYS[3], ARGV[i], ARGV[i + 2])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[3], ARGV[1])
+return 1
+""")
+
+
+def normalize_paper_id(title):
+    """제목을 소문자 + 영숫자만 남긴 형태로 정규화 (표기 차이로 같은 논문이 나뉘지 않도록)"""
+    return re.sub(r"[^0-9a-z]+", " ", title.lower()).strip()
+
+
+def register_map_tasks(task_id, total_map_tasks):
+    """map 태스크 발행 전에 호출. reduce 발행 판단에 쓰일 전체 map 태스크 수를 저장한다."""
+    redis_client.set(f"openalex:{task_id}:total", total_map_tasks, ex=_KEY_TTL)
+
+
+def record_map_results(task_id, papers, map_id):
+    """
+    map 태스크 결과를 누적. 논문 id별 빈도(hits, 기본 1)를 ZINCRBY로 더하고
+    논문 정보는 처음 도착한 것만 hash에 저장한다.
+    같은 map_id는 한 번만 누적된다 (기록 후 실패해 재시도된 map 태스크의 중복 집계 방지).
+    """
+    args = [_KEY_TTL]
+    for paper in papers:
+        args.extend([normalize_paper_id(paper['title']), paper.get('hits', 1), json.dumps(paper)])
+    recorded = _RECORD_SCRIPT(
+        keys=[f"openalex:{task_id}:recorded:{map_id}", f"openalex:{task_id}:scores", f"openalex:{task_id}:meta"],
+        args=args,
+    )
+    if not recorded:
+        logger.info(f"[MAP] 이미 기록된 map 태스크 → 누적 생략: task_id={task_id}, map_id={map_id}")
+
+
+def _dispatch_pdf_tasks(task_id, paper_ids, meeting_id):
+    """
+    아직 발행되지 않은 논문만 PDF 워커에 발행 (reduce 재시도 시 중복 발행 방지)
+    차단된 호스트의 논문은 _rank_by_host_health에서 이미 제외된다.
+    """
+    if not paper_ids:
+        return []
+    dispatched_key = f"openalex:{task_id}:dispatched"
+    metas = redis_client.hmget(f"openalex:{task_id}:meta", paper_ids)
+    candidates = [(paper_id, json.loads(meta)) for paper_id, meta in zip(paper_ids, metas) if meta is not None]
+    papers = []
+    for paper_id, paper in candidates:
+        if not redis_client.sadd(dispatched_key, paper_id):
+            continue
         logger.info(f"[REDUCE] PDF 워커에 태스크 발행: {paper['title']}")
         celery_app.send_task(
             'workers.pdf_worker.download_and_extract',
-            args=[paper['title'], paper['pdf'], meeting_id, meeting_text]
+            args=[paper['title'], paper['pdf'], meeting_id]
         )
+        papers.append(paper)
+    redis_client.expire(dispatched_key, _KEY_TTL)
+    return papers
+
+
+def schedule_reduce(task_id, total_map_tasks, meeting_id):
+    """
+    reduce 인자가 준비되면 호출 (map 태스크 발행 이후여도 됨).
+    reduce 인자를 Redis에 저장해 두고, 마지막 map 태스크가 끝나면 reduce가 발행되도록 한다.
+    map 태스크가 끝나지 않는 경우를 대비해 timeout 후 partial reduce도 예약한다.
+    (countdown 태스크는 워커 슬롯을 점유하지 않고 대기)
+    """
+    reduce_args = [task_id, total_map_tasks, meeting_id]
+    redis_client.set(f"openalex:{task_id}:reduce_args", json.dumps(reduce_args), ex=_KEY_TTL)
+
+    celery_app.send_task(
+        'workers.openalex_reduce_worker.reduce',
+        args=reduce_args,
+        kwargs={'partial': True},
+        countdown=_REDUCE_TIMEOUT
+    )
+
+    # 인자 저장 전에 map 태스크가 모두 끝났다면 여기서 reduce 발행 (중복 발행은 reduce에서 걸러짐)
+    if int(redis_client.get(f"openalex:{task_id}:done") or 0) >= total_map_tasks:
+        logger.info(f"[REDUCE] map 태스크가 이미 완료됨 → reduce 발행: task_id={task_id}")
+        celery_app.send_task('workers.openalex_reduce_worker.reduce', args=reduce_args)
+
+
+def mark_map_done(task_id):
+    """
+    map 태스크 1개 완료(성공 또는 재시도 후 최종 실패) 시 호출.
+    완료 카운터를 원자적으로 증가시키고, 마지막 map 태스크였다면 reduce를 발행한다.
+    reduce 인자가 아직 없으면 schedule_reduce 쪽에서 발행한다.
+    """
+    done = redis_client.incr(f"openalex:{task_id}:done")
+    redis_client.expire(f"openalex:{task_id}:done", _KEY_TTL)
+    total = int(redis_client.get(f"openalex:{task_id}:total") or 0)
+    if not total or done != total:
+        return
+
+    reduce_args = redis_client.get(f"openalex:{task_id}:reduce_args")
+    if reduce_args is None:
+        logger.info(f"[REDUCE] reduce 인자 미등록 → schedule_reduce에서 발행 예정: task_id={task_id}")
+        return
+    reduce_args = json.loads(reduce_args)
+
+    logger.info(f"[REDUCE] 모든 map 태스크 완료 → reduce 발행: task_id={task_id}")
+    celery_app.send_task(
+        'workers.openalex_reduce_worker.reduce',
+        args=reduce_args
+    )
+
+
+def _rank_by_host_health(task_id):
+    """
+    빈도 상위 _CANDIDATE_POOL개 후보를 (빈도 × 호스트 건강 가중치)로 다시 정렬해 상위 _TOP_K개 선정.
+    차단 중인 호스트의 논문은 제외하고 다음 후보로 채운다.
+    """
+    ranked = redis_client.zrevrange(f"openalex:{task_id}:scores", 0, _CANDIDATE_POOL - 1, withscores=True)
+    ids = [paper_id.decode() for paper_id, _ in ranked]
+    metas = redis_client.hmget(f"openalex:{task_id}:meta", ids) if ids else []
+    candidates = [
+        (paper_id, score, json.loads(meta))
+        for (_, score), paper_id, meta in zip(ranked, ids, metas) if meta
+    ]
+    health = host_health.host_scores(paper['pdf'] for _, _, paper in candidates)
+
+    weighted = []
+    for paper_id, score, paper in candidates:
+        host_score = health.get(host_of(paper['pdf']), 1.0)
+        if host_score == 0:
+            logger.info(f"[REDUCE] 차단된 호스트 논문 제외: {paper['title']}")
+            continue
+        weighted.append((score * (_HEALTH_FLOOR + (1 - _HEALTH_FLOOR) * host_score), paper_id, paper))
+    weighted.sort(key=lambda item: item[0], reverse=True)
+    top = weighted[:_TOP_K]
+    return [paper_id for _, paper_id, _ in top], [paper for _, _, paper in top]
+
+
+def _select_and_dispatch(task_id, total_map_tasks, meeting_id):
+    """누적 빈도 상위 20개 논문을 선정하고 아직 발행되지 않은 논문을 PDF 워커에 발행"""
+    done = int(redis_client.get(f"openalex:{task_id}:done") or 0)
+    if done < total_map_tasks:
+        logger.warning(f"[REDUCE] timeout → partial reduce 수행: 완료 {done} / {total_map_tasks}")
+
+    # 등장 빈도 기준 상위 후보 추출 (map 단계에서 이미 집계됨) 후 호스트 상태로 순위 조정
+    top_ids, top_papers = _rank_by_host_health(task_id)
+    logger.info(f"[REDUCE] 상위 {_TOP_K}개 논문 선정: {[p['title'] for p in top_papers]}")
+
+    # PDF 워커에 태스크 발행 (이전 시도에서 발행된 논문 제외)
+    _dispatch_pdf_tasks(task_id, top_ids, meeting_id)
+
+    # map 결과 정리 (늦게 끝난 map 태스크의 결과는 무시됨)
+    redis_client.delete(f"openalex:{task_id}:scores", f"openalex:{task_id}:meta")
+    return top_papers
+
+
+@celery_app.task(name='workers.openalex_reduce_worker.reduce', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
+def reduce_openalex_results(self, task_id, total_map_tasks, meeting_id, partial=False):
+    logger.info(f"[REDUCE] 태스크 시작: task_id={task_id}, total_map_tasks={total_map_tasks}, meeting_id={meeting_id}, partial={partial}")
+
+    # 완료 이벤트와 timeout 중 먼저 도착한 reduce만 실행 (중복 발행 방지)
+    if not redis_client.set(f"openalex:{task_id}:reduced", 1, nx=True, ex=_KEY_TTL):
+        logger.info(f"[REDUCE] 이미 처리된 task_id → 종료: {task_id}")
+        return []
+
+    try:
+        top_papers = _select_and_dispatch(task_id, total_map_tasks, meeting_id)
+    except Exception:
+        # 재시도 시 다시 실행될 수 있도록 선점 해제
+        redis_client.delete(f"openalex:{task_id}:reduced")
+        raise
+
     # 필요시 결과를 Spring 서버 등에도 전달 가능
     logger.info(f"[REDUCE] 최종 top_papers 반환")
-    return top_papers
\ No newline at end of file
+    return top_papers
@@ -1,18 +1,23 @@
 from app.celery_app import celery_app
-from app.services.openalex_service import query_openalex
-import redis
-import json
+from app.services.query_planner import query_planned
+from app.workers.openalex_reduce_worker import mark_map_done, record_map_results
+import logging
 
-redis_client = redis.Redis(host='localhost', port=6379, db=2)
+logger = logging.getLogger(__name__)
 
-@celery_app.task(name='workers.openalex_worker.query_papers', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
-def query_papers_task(self, combo, task_id):
-    # 키워드 조합으로 OpenAlex API 호출
-    papers = query_openalex(combo)  # [{title, pdf, ...}, ...]
-    # 각 논문에 combo 정보도 함께 저장 (reduce에서 활용 가능)
-    for paper in papers:
-        paper['combo'] = combo
-        redis_client.rpush(f"openalex:{task_id}", json.dumps(paper))
-    # Redis 키의 값을 1 증가시켜 Reduce 워커에 태스크 진행도 전달 
-    redis_client.incr(f"openalex:{task_id}:done")
-    return True
\ No newline at end of file
+_MAX_RETRIES = 1
+
+@celery_app.task(name='workers.openalex_worker.query_planned', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': _MAX_RETRIES, 'countdown': 5}, time_limit=300, soft_time_limit=290)
+def query_planned_task(self, keywords, page, task_id):
+    try:
+        # 기본 쿼리 한 페이지 조회 + 논문별 매칭 조합 계산 (hits = 매칭 조합 수)
+        papers = query_planned(keywords, page)  # [{title, pdf, combos, hits, ...}, ...]
+        # 재시도 시 같은 페이지 결과가 두 번 집계되지 않도록 map 태스크(페이지)별 1회만 기록
+        record_map_results(task_id, papers, page)
+    except Exception:
+        if self.request.retries >= _MAX_RETRIES:
+            logger.error(f"[MAP] 재시도 후 최종 실패: page={page}, task_id={task_id}")
+            mark_map_done(task_id)
+        raise
+    mark_map_done(task_id)
+    return True
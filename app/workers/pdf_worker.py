@@ -1,43 +1,41 @@
 from app.celery_app import celery_app
 from app.services.crawling_service import CrawlingService
 from app.dtos.paperItem_dto import PaperItem
-from app.celery_app import celery_app
-import os
-import redis
-import json
+from app.services import relevance_model
+from app.services.document_store import document_store
+import logging
 
-redis_client = redis.Redis(host='localhost', port=6379, db=3)
+logger = logging.getLogger(__name__)
 
 @celery_app.task(name='workers.pdf_worker.download_and_extract', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
-def download_and_extract(self, title, pdf_url, meeting_id, meeting_text):
+def download_and_extract(self, title, pdf_url, meeting_id):
     crawler = CrawlingService()
 
     # todo PaperItem에서 paper_id 제거
     paper_item = PaperItem(paper_id=0, title=title, pdf_url=pdf_url, status="success")
     crawled = crawler.crawl_single_paper_text(paper_item)
-    text = crawled.text_content
 
-    # txt 파일로 저장
-    txt_dir = './papers_txt'
-    os.makedirs(txt_dir, exist_ok=True)
-    txt_path = os.path.join(txt_dir, f'{meeting_id}_{title}.txt')
-    with open(txt_path, 'w', encoding='utf-8') as f:
-        f.write(crawled.text_content)
+    # 크롤링 실패(빈 본문)는 전달하지 않음
+    # 빈 본문은 모두 같은 doc_id가 되어 회의별 중복 확인에 걸리고, 코퍼스 IDF도 왜곡한다.
+    if not crawled.text_content or not crawled.text_content.strip():
+        logger.warning(f"[PDF Worker] 본문 추출 실패 → 관련도 계산 생략: {title} ({pdf_url})")
+        return
+
+    # 본문은 문서 저장소에 한 번만 저장하고 이후 태스크에는 doc_id만 전달
+    doc_id = document_store.put(crawled.text_content)
+    # 도착 시 1회 벡터화 (코퍼스 IDF 갱신 포함)
+    relevance_model.add_document(doc_id, crawled.text_content)
 
-    # Redis에 논문 정보 push
+    # relevance_worker에 논문 메타데이터 전달 (본문은 doc_id로만 참조, 도착 즉시 점수 계산)
     paper_info = {
         'title': title,
-        'txt_path': txt_path,
-        'text_content': crawled.text_content,
+        'doc_id': doc_id,
         'meeting_id': meeting_id,
         'pdf_url': pdf_url
     }
-    redis_client.rpush(f"relevance:{meeting_id}:papers", json.dumps(paper_info))
-
-    # relevance_worker에 태스크 발행 (논문 1개 도착 알림)
     celery_app.send_task(
-        'workers.relevance_worker.check_and_select',
-        args=[meeting_id, meeting_text]
+        'workers.relevance_worker.score_paper',
+        args=[meeting_id, paper_info]
     )
 
 
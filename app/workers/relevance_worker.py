@@ -1,139 +1,189 @@
 from app.celery_app import celery_app
+from app.services import lsa_model, meeting_context, relevance_model
+from app.services.document_store import document_store
+from app.services.record_codec import pack_record, unpack_record
 import redis
-import json
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from concurrent.futures import ThreadPoolExecutor
-import numpy as np
+import logging
 import os
 
 redis_client = redis.Redis(host='localhost', port=6379, db=3)
+logger = logging.getLogger(__name__)
 
-def delete_txt_file(txt_path):
-    """txt 파일 삭제"""
-    try:
-        if os.path.exists(txt_path):
-            os.remove(txt_path)
-    except Exception as e:
-        print(f"파일 삭제 중 에러 발생: {str(e)}")
-
-# TF-IDF 코사인 유사도 계산
-def process_paper_batch(papers_batch, meeting_text):
-    # 1. 회의록과 논문들의 텍스트를 하나의 리스트로 합침
-    # - 첫 번째 요소는 회의록, 나머지는 논문들의 텍스트
-    # - 예: ["회의록 내용", "논문1 내용", "논문2 내용", ...]
-    texts = [meeting_text] + [p['text_content'] for p in papers_batch]
-
-    # 2. TF-IDF 벡터화 수행
-    # - TF(단어 빈도): 특정 단어가 문서에 얼마나 자주 등장하는지
-    # - IDF(역문서 빈도): 전체 문서에서 해당 단어가 얼마나 희소한지
-    # - stop_words='english': 'the', 'is' 같은 불용어 제거
-    # - 각 문서를 고차원 벡터로 변환 (단어 수만큼의 차원)
-    vectorizer = TfidfVectorizer(stop_words='english')
-    # - 각 문서를 고차원 벡터로 변환 (단어 수만큼의 차원)
-    tfidf_matrix = vectorizer.fit_transform(texts)
-
-    # 3. 코사인 유사도 계산
-    # - tfidf_matrix[0:1]: 회의록의 TF-IDF 벡터
-    # - tfidf_matrix[1:]: 논문들의 TF-IDF 벡터
-    # - 결과: 회의록과 각 논문 간의 유사도 점수 (0~1 사이 값)
-    # - 1에 가까울수록 더 유사함을 의미
-    similarities = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:])[0]
-    return similarities
-
-def chunk_text(text, chunk_size=2000):
-    """텍스트를 청크 단위로 분할"""
-    return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-
-@celery_app.task(name='workers.relevance_worker.check_and_select', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
-def check_and_select(self, meeting_id, meeting_text):
-    # Redis에서 논문 리스트 가져오기
-    paper_jsons = redis_client.lrange(f"relevance:{meeting_id}:papers", 0, -1)
-    if len(paper_jsons) < 5:  # 5개 미만이면 대기
-        return
+# 한 번에 선정해 llm_worker로 보낼 논문 수
+_SELECT_K = 3
+# 마지막 선정 이후 이만큼 새 논문이 도착하면 선정
+_BATCH_SIZE = int(os.getenv('RELEVANCE_BATCH_SIZE', 5))
+# 선정 대기 중인 논문이 생긴 뒤 이 시간(초)이 지나면 도착한 논문 수와 관계없이 선정
+_FLUSH_DEADLINE = int(os.getenv('RELEVANCE_FLUSH_DEADLINE', 90))
+_KEY_TTL = 3600
+# 유사도 계산 방식(RELEVANCE_SCORING)은 회의 컨텍스트에 회의별로 고정된다 (meeting_context 참고)
+# chunk 방식의 청크 점수 집계: max | topk
+_CHUNK_POOLING = os.getenv('RELEVANCE_CHUNK_POOLING', 'max')
+
+# Redis 키 구성
+# - relevance:{meeting_id}:candidates  아직 선정되지 않은 논문 레코드 → 유사도 (sorted set)
+# - relevance:{meeting_id}:pending     마지막 선정 이후 도착한 논문 수
+# - relevance:{meeting_id}:flush       마감 선정 태스크 예약 여부
+# - relevance:{meeting_id}:seen        후보로 등록된 논문 doc_id (set, 중복 전달/재시도 시 재등록 방지)
+# - relevance:{meeting_id}:summarized  llm_worker에 전송된 논문 doc_id (set, 요약 중복 발행 방지)
+
+# 중복 확인 + 후보 추가 + 배치 조건 확인 + 상위 K개 pop을 원자적으로 처리
+# 여러 relevance 워커가 동시에 실행돼도 한 논문은 한 번만 등록되고, pop된 배치는 한 워커만 가져간다.
+# 이미 등록된 논문이면 nil을 반환한다.
+_ARRIVE_SCRIPT = redis_client.register_script("""
+if redis.call('SADD', KEYS[3], ARGV[6]) == 0 then
+    return false
+end
+redis.call('EXPIRE', KEYS[3], ARGV[5])
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+local pending = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+if pending >= tonumber(ARGV[3]) then
+    redis.call('SET', KEYS[2], 0, 'EX', ARGV[5])
+    return redis.call('ZPOPMAX', KEYS[1], ARGV[4])
+end
+return {}
+""")
+
+# 마감 시각: 대기 중인 논문이 있으면 남은 후보에서 상위 K개 pop
+_FLUSH_SCRIPT = redis_client.register_script("""
+if tonumber(redis.call('GET', KEYS[2]) or '0') > 0 then
+    redis.call('SET', KEYS[2], 0, 'EX', ARGV[2])
+    return redis.call('ZPOPMAX', KEYS[1], ARGV[1])
+end
+return {}
+""")
+
+# 전송 실패로 되돌린 후보를 대기 논문 수에 다시 더함 (pop 시 pending을 0으로 초기화했으므로,
+# 더하지 않으면 재시도는 seen에 걸려 종료되고 마감 선정도 pop하지 않아 후보가 영영 선정되지 않음)
+_RESTORE_SCRIPT = redis_client.register_script("""
+redis.call('ZADD', KEYS[1], unpack(ARGV, 2))
+redis.call('INCRBY', KEYS[2], (#ARGV - 1) / 2)
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+""")
+
+
+def _keys(meeting_id):
+    return [f"relevance:{meeting_id}:candidates", f"relevance:{meeting_id}:pending", f"relevance:{meeting_id}:seen"]
 
-    # 누적된 논문 가져오기
-    accumulated_papers = []
-    accumulated_key = f"relevance:{meeting_id}:accumulated"
-    accumulated_jsons = redis_client.lrange(accumulated_key, 0, -1)
-    if accumulated_jsons:
-        accumulated_papers = [json.loads(p) for p in accumulated_jsons]
-
-    # 현재 배치의 논문
-    current_papers = [json.loads(p) for p in paper_jsons]
-    
-    # 모든 논문 합치기 (누적 + 현재)
-    all_papers = accumulated_papers + current_papers
-    
-    # 병렬 처리를 위한 배치 분할
-    batch_size = 2  # 각 스레드가 처리할 논문 수
-    # 논문 배치 생성
-    paper_batches = [all_papers[i:i + batch_size] for i in range(0, len(all_papers), batch_size)]
-    
-    # ThreadPoolExecutor로 병렬 처리
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        # 각 배치에 대해 유사도 계산
-        batch_similarities = list(executor.map(
-            lambda batch: process_paper_batch(batch, meeting_text),
-            paper_batches
-        ))
-    
-    # 모든 배치의 유사도 결과 병합
-    all_similarities = np.concatenate(batch_similarities)
-    
-    # 상위 3개 논문 선택
-    top_indices = all_similarities.argsort()[::-1][:3]
-    
-    # 선택된 논문과 누적될 논문 분리
-    selected_papers = []
-    remaining_papers = []
-    
-    for i, paper in enumerate(all_papers):
-        if i in top_indices:
-            selected_papers.append(paper)
-        else:
-            remaining_papers.append(paper)
-    
-    # 선택된 논문을 llm_worker에 전송하고 역색인 처리
-    for paper in selected_papers:
-        # llm_worker에 전송
+
+def _score(meeting_vector, scorer, doc_id):
+    """
+    scorer: 회의에 고정된 계산 방식 (document | chunk | lsa:{모델 버전}), 같은 회의의 논문은 모두 같은 척도로 계산
+    chunk 방식: 문서 저장소의 본문을 청크로 나눠 청크별 유사도를 pooling.
+      논문은 각자의 태스크로 도착하므로 score_chunks를 논문 1편씩 호출한다 (여러 후보의 청크를 한 행렬로 묶지 않음).
+      pdf_worker의 add_document에 이어 본문 전체를 한 번 더 토큰화하므로, 도착당 비용은 document 방식보다 크다.
+    document/lsa 방식: 도착 시 계산해 둔 논문 벡터로 유사도 계산 (벡터가 만료됐으면 본문을 읽어 다시 벡터화)
+    """
+    method, _, version = scorer.partition(':')
+    if method == 'chunk':
+        text = document_store.get(doc_id) or ''
+        return relevance_model.score_chunks(meeting_vector, {doc_id: text}, pooling=_CHUNK_POOLING)[doc_id]
+
+    def score_documents(doc_ids):
+        if method == 'lsa':
+            return lsa_model.score_documents(meeting_vector, doc_ids, version=version)
+        return relevance_model.score_documents(meeting_vector, doc_ids)
+
+    score = score_documents([doc_id])[doc_id]
+    if score is None:
+        relevance_model.add_document(doc_id, document_store.get(doc_id) or '')
+        score = score_documents([doc_id])[doc_id]
+    return score or 0.0
+
+
+def _schedule_flush(meeting_id):
+    """논문이 _BATCH_SIZE개까지 모이지 않아도 마감 시각에 선정되도록 예약 (대기 구간마다 1회)"""
+    if redis_client.set(f"relevance:{meeting_id}:flush", 1, nx=True, ex=_FLUSH_DEADLINE):
         celery_app.send_task(
-            'workers.llm_worker.summarize_paper',
-            args=[paper['title'], paper['meeting_id'], paper['txt_path'], paper.get('pdf_url', '')]
+            'workers.relevance_worker.flush_selection',
+            args=[meeting_id],
+            countdown=_FLUSH_DEADLINE
         )
-        
-        # 역색인 처리
-        chunks = chunk_text(paper['text_content'], 2000)
-        for chunk in chunks:
+
+
+def _dispatch_selected(meeting_id, popped):
+    """
+    ZPOPMAX 결과([레코드, 점수, ...])의 논문을 llm_worker와 역색인 워커에 전송.
+    전송 도중 실패하면 pop한 후보와 대기 논문 수를 함께 되돌리고 마감 선정을 예약해 다시 선정되게 한다.
+    (이미 전송된 논문은 summarized 집합으로 걸러져 중복 요약되지 않음)
+    """
+    try:
+        _send_selected(meeting_id, [unpack_record(record) for record in popped[::2]])
+    except Exception:
+        restored = [value for record, score in zip(popped[::2], popped[1::2]) for value in (score, record)]
+        _RESTORE_SCRIPT(keys=_keys(meeting_id)[:2], args=[_KEY_TTL, *restored])
+        _schedule_flush(meeting_id)
+        raise
+
+
+def _send_selected(meeting_id, selected_papers):
+    if not selected_papers:
+        return
+    logger.info(f"[RELEVANCE] 논문 선정: meeting_id={meeting_id}, {[p['title'] for p in selected_papers]}")
+
+    summarized_key = f"relevance:{meeting_id}:summarized"
+    sent_doc_ids = []
+    try:
+        for paper in selected_papers:
+            # 이미 다른 워커/이전 시도에서 전송된 논문은 건너뜀
+            if not redis_client.sadd(summarized_key, paper['doc_id']):
+                logger.info(f"[RELEVANCE] 이미 전송된 논문 → 건너뜀: {paper['title']}")
+                continue
+            redis_client.expire(summarized_key, _KEY_TTL)
+            try:
+                # llm_worker에 전송
+                celery_app.send_task(
+                    'workers.llm_worker.summarize_paper',
+                    args=[paper['title'], paper['meeting_id'], paper['doc_id'], paper.get('pdf_url', '')]
+                )
+            except Exception:
+                redis_client.srem(summarized_key, paper['doc_id'])
+                raise
+            sent_doc_ids.append(paper['doc_id'])
+    finally:
+        # 역색인 처리: 이번에 전송된 논문들을 태스크 1개로 묶어 doc_id만 전달 (전송 도중 실패해도 전송된 논문은 색인)
+        if sent_doc_ids:
             celery_app.send_task(
                 'workers.invertedindex_worker.build_inverted_index',
-                args=[chunk, meeting_id]
+                args=[meeting_id, sent_doc_ids]
             )
-    
-    # 처리된 논문 제거
-    for paper_json in paper_jsons:
-        redis_client.lrem(f"relevance:{meeting_id}:papers", 0, paper_json)
-    
-    # 누적 논문 업데이트
-    redis_client.delete(accumulated_key)  # 기존 누적 논문 삭제
-    if remaining_papers:  # 남은 논문이 있으면 누적
-        for paper in remaining_papers:
-            redis_client.rpush(accumulated_key, json.dumps(paper))
-    
-    # 남은 논문이 5개 이상이면 다시 처리
-    if len(redis_client.lrange(f"relevance:{meeting_id}:papers", 0, -1)) >= 5:
-        celery_app.send_task(
-            'workers.relevance_worker.check_and_select',
-            args=[meeting_id, meeting_text]
-        )
-    else:
-        # 20개의 논문이 모두 처리되었을 때
-        # 누적된 논문들의 txt 파일 삭제
-        accumulated_jsons = redis_client.lrange(accumulated_key, 0, -1)
-        if accumulated_jsons:
-            for paper_json in accumulated_jsons:
-                paper = json.loads(paper_json)
-                if 'txt_path' in paper:
-                    delete_txt_file(paper['txt_path'])
-            # 누적된 논문 리스트도 삭제
-            redis_client.delete(accumulated_key)
+
+
+@celery_app.task(name='workers.relevance_worker.score_paper', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
+def score_paper(self, meeting_id, paper):
+    """
+    pdf_worker가 논문 1개를 전달할 때마다 실행.
+    회의 컨텍스트에 저장된 회의록 벡터로 유사도를 한 번만 계산해 회의별 후보 sorted set에 넣고,
+    마지막 선정 이후 _BATCH_SIZE개가 도착했으면 상위 _SELECT_K개를 원자적으로 꺼내 선정한다.
+    """
+    meeting_vector = meeting_context.get_vector(meeting_id)
+    if meeting_vector is None:
+        logger.error(f"[RELEVANCE] 회의 컨텍스트 없음 → 논문 건너뜀: meeting_id={meeting_id}, {paper['title']}")
+        return
+    score = _score(meeting_vector, meeting_context.get_scorer(meeting_id), paper['doc_id'])
+    logger.info(f"[RELEVANCE] 논문 점수: {paper['title']} → {score:.4f}")
+
+    popped = _ARRIVE_SCRIPT(
+        keys=_keys(meeting_id),
+        args=[score, pack_record(paper), _BATCH_SIZE, _SELECT_K, _KEY_TTL, paper['doc_id']],
+    )
+    if popped is None:
+        logger.info(f"[RELEVANCE] 이미 등록된 논문 → 종료: {paper['title']}")
+        return
+    if popped:
+        _dispatch_selected(meeting_id, popped)
+        return
+    _schedule_flush(meeting_id)
+
+
+@celery_app.task(name='workers.relevance_worker.flush_selection', bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 1, 'countdown': 5}, time_limit=300, soft_time_limit=290)
+def flush_selection(self, meeting_id):
+    """마감 시각 선정: 마지막 선정 이후 도착한 논문이 있으면 남은 후보 중 상위 _SELECT_K개 선정"""
+    redis_client.delete(f"relevance:{meeting_id}:flush")
+    popped = _FLUSH_SCRIPT(keys=_keys(meeting_id), args=[_SELECT_K, _KEY_TTL])
+    if popped:
+        logger.info(f"[RELEVANCE] 마감 시각 선정: meeting_id={meeting_id}")
+        _dispatch_selected(meeting_id, popped)
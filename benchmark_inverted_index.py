@@ -0,0 +1,205 @@
+"""
+역색인 저장 방식 비교 벤치마크 (기본: 로컬 SQLite, MySQL 불필요)
+
+사용법:
+    python benchmark_inverted_index.py [--papers 20] [--paper-chars 200000] [--batch 3]
+                                       [--backend sqlite|mysql] [--mysql-table inverted_index_bench] [--runs 3]
+
+- legacy : 2000자 청크마다 새 연결 + 단어마다 INSERT 1회 (이전 invertedindex_worker 방식)
+- bulk   : 선정 배치(--batch 편)마다 단어를 합쳐 연결 풀 + 다중 행 INSERT IGNORE 1회 (현재 방식)
+각 방식마다 빈 테이블에서 시작해 전체 논문을 저장하는 시간과 연결/문장 수를 측정하고,
+bulk는 같은 입력을 한 번 더 저장해 행 수가 변하지 않는지(멱등성) 확인한다.
+sqlite 백엔드는 임시 파일에 기록하고 끝나면 삭제한다.
+mysql 백엔드는 INDEX_DB_* 설정의 DB에 --mysql-table 벤치마크 전용 테이블을 만들어(없으면) 쓰고 비운다.
+운영 테이블(inverted_index)은 지정할 수 없다.
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# app 패키지 import 시 필요한 환경변수 로드
+load_dotenv()
+
+from app.services import inverted_index_store
+from app.services.relevance_model import chunk_text
+
+# 결과 저장 디렉토리 설정 (benchmark.py와 동일)
+BENCHMARK_DIR = os.path.join(os.path.dirname(__file__), 'benchmark')
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+
+def build_papers(n_papers, paper_chars, seed):
+    rng = random.Random(seed)
+    vocabulary = [f"word{j}" for j in range(20000)]
+    papers = []
+    for _ in range(n_papers):
+        words, size = [], 0
+        while size < paper_chars:
+            word = vocabulary[min(int(rng.paretovariate(1.1)) - 1, len(vocabulary) - 1)] if rng.random() < 0.7 \
+                else rng.choice(vocabulary)
+            words.append(word.upper() if rng.random() < 0.05 else word)
+            size += len(word) + 1
+        papers.append(" ".join(words))
+    return papers
+
+
+class _SQLiteBackend:
+    def __init__(self, path):
+        self.path = path
+        self.store = inverted_index_store.SQLiteIndexStore(path)
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    sql = "INSERT OR IGNORE INTO inverted_index (paper_word, meeting_id) VALUES (?, ?)"
+
+    def count(self):
+        with self.connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM inverted_index").fetchone()[0]
+
+    def clear(self):
+        with self.connect() as conn:
+            conn.execute("DELETE FROM inverted_index")
+
+
+class _MySQLBackend:
+    def __init__(self, table):
+        if not re.fullmatch(r"\w+", table):
+            raise SystemExit(f"테이블 이름이 올바르지 않습니다: {table}")
+        if table == inverted_index_store._TABLE:
+            raise SystemExit(f"운영 테이블({table})은 벤치마크에 사용할 수 없습니다. --mysql-table로 전용 테이블을 지정하세요")
+        self.table = table
+        self.store = inverted_index_store.MySQLIndexStore(table=table)
+        self.store.create_table()
+        self.sql = f"INSERT IGNORE INTO {table} (paper_word, meeting_id) VALUES (%s, %s)"
+
+    def connect(self):
+        return inverted_index_store._ConnectionPool._connect()
+
+    def count(self):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {self.table}")
+                return cursor.fetchone()[0]
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self.connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {self.table}")
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def run_legacy(backend, papers, meeting_id):
+    """청크마다 새 연결, 단어마다 INSERT (unique key가 있는 테이블이라 중복 단어는 IGNORE로 무시)"""
+    connections = statements = 0
+    for text in papers:
+        for chunk in chunk_text(text, 2000):
+            words = {w.lower() for w in chunk.split()}
+            conn = backend.connect()
+            connections += 1
+            try:
+                cursor = conn.cursor()
+                for word in words:
+                    cursor.execute(backend.sql, (word, meeting_id))
+                    statements += 1
+                conn.commit()
+            finally:
+                conn.close()
+    return connections, statements
+
+
+def run_bulk(backend, papers, meeting_id, batch):
+    """선정 배치마다 단어를 합쳐 1회 저장 (다중 행 INSERT 문 수 = 단어 수 / _INSERT_BATCH 올림)"""
+    tasks = statements = 0
+    for i in range(0, len(papers), batch):
+        words = set()
+        for text in papers[i:i + batch]:
+            words |= inverted_index_store.index_words(text)
+        backend.store.add_words(meeting_id, words)
+        tasks += 1
+        statements += -(-len(words) // inverted_index_store._INSERT_BATCH)
+    return tasks, statements
+
+
+def run_benchmark(args, backend):
+    papers = build_papers(args.papers, args.paper_chars, args.seed)
+    print(f"=== 역색인 저장 벤치마크 ({args.backend}, 논문 {len(papers)}편 × {args.paper_chars}자, "
+          f"배치 {args.batch}편, {args.runs}회 반복) ===")
+    rows = []
+    for run in range(1, args.runs + 1):
+        meeting_id = f"bench-{run}"
+
+        backend.clear()
+        started = time.perf_counter()
+        connections, statements = run_legacy(backend, papers, meeting_id)
+        seconds = time.perf_counter() - started
+        rows.append({'method': 'legacy', 'run': run, 'seconds': seconds, 'tasks': connections,
+                     'connections': connections, 'statements': statements, 'rows': backend.count()})
+
+        backend.clear()
+        started = time.perf_counter()
+        tasks, statements = run_bulk(backend, papers, meeting_id, args.batch)
+        seconds = time.perf_counter() - started
+        stored = backend.count()
+        run_bulk(backend, papers, meeting_id, args.batch)
+        rows.append({'method': 'bulk', 'run': run, 'seconds': seconds, 'tasks': tasks,
+                     'connections': 1, 'statements': statements, 'rows': stored, 'idempotent': backend.count() == stored})
+        print(f"#{run}: legacy {rows[-2]['seconds']:.2f}초 ({rows[-2]['connections']}연결, "
+              f"{rows[-2]['statements']}문장) / bulk {seconds:.2f}초 ({tasks}태스크, {statements}문장)")
+    backend.clear()
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="역색인 저장 방식 비교")
+    parser.add_argument('--papers', type=int, default=20)
+    parser.add_argument('--paper-chars', type=int, default=200000)
+    parser.add_argument('--batch', type=int, default=3, help="relevance 선정 1회당 논문 수 (_SELECT_K)")
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--mysql-table', default='inverted_index_bench', help="mysql 백엔드의 벤치마크 전용 테이블")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.backend == 'sqlite':
+        tmp_dir = tempfile.mkdtemp(prefix="inverted_index_bench_")
+        backend = _SQLiteBackend(os.path.join(tmp_dir, "inverted_index.db"))
+    else:
+        backend = _MySQLBackend(args.mysql_table)
+    try:
+        df = run_benchmark(args, backend)
+    finally:
+        if tmp_dir:
+            for name in os.listdir(tmp_dir):
+                os.remove(os.path.join(tmp_dir, name))
+            os.rmdir(tmp_dir)
+
+    summary = df.groupby('method')[['seconds', 'tasks', 'connections', 'statements', 'rows']].mean()
+    summary['speedup'] = summary.loc['legacy', 'seconds'] / summary['seconds']
+    print("\n=== 방식별 요약 (평균) ===")
+    print(summary.to_string(float_format=lambda v: f"{v:.2f}"))
+    if not df.loc[df['method'] == 'bulk', 'idempotent'].all():
+        print("실패: bulk 재실행 시 행 수가 변했습니다")
+        sys.exit(1)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    detail_path = os.path.join(RESULTS_DIR, f"inverted_index_{timestamp}.csv")
+    df.to_csv(detail_path, index=False)
+    print(f"\n결과가 '{detail_path}'에 저장되었습니다.")
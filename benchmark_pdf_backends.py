@@ -0,0 +1,149 @@
+"""
+PDF 텍스트 추출 백엔드 비교 벤치마크
+
+사용법:
+    python benchmark_pdf_backends.py <샘플 PDF 디렉토리> [--backends pypdf2 pdfminer pdfium] [--runs 3]
+                                     [--timeout 300]
+
+각 백엔드 × 파일 조합을 새 프로세스(spawn)에서 실행해 측정값이 서로 섞이지 않도록 한다.
+- pages/sec : 전체 페이지 수 / 추출 시간
+- peak RSS  : 추출 프로세스의 최대 메모리 사용량 (MB)
+- chars     : 추출된 문자 수 (텍스트 품질 비교용, 0에 가까우면 추출 실패)
+자식 프로세스가 비정상 종료하거나 --timeout 초 안에 끝나지 않으면 해당 측정은 실패로 기록한다.
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import queue
+import resource
+import sys
+import time
+from datetime import datetime
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# app 패키지 import 시 필요한 환경변수 로드
+load_dotenv()
+
+from app.services.pdf_backends import BACKENDS, get_backend
+
+# 결과 저장 디렉토리 설정 (benchmark.py와 동일)
+BENCHMARK_DIR = os.path.join(os.path.dirname(__file__), 'benchmark')
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+
+def _peak_rss_mb():
+    """현재 프로세스의 최대 RSS (Linux는 KB, macOS는 바이트 단위)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _run_single(backend_name, pdf_path, result_queue):
+    """자식 프로세스에서 실행: 파일 1개를 전체 페이지 추출"""
+    try:
+        backend = get_backend(backend_name)
+        baseline_rss = _peak_rss_mb()
+        started = time.perf_counter()
+        doc = backend.open(pdf_path)
+        try:
+            pages = backend.page_count(doc)
+            chars = sum(len(backend.page_text(doc, i)) for i in range(pages))
+        finally:
+            backend.close(doc)
+        elapsed = time.perf_counter() - started
+        result_queue.put({
+            'pages': pages,
+            'chars': chars,
+            'seconds': elapsed,
+            'peak_rss_mb': _peak_rss_mb(),
+            'rss_delta_mb': _peak_rss_mb() - baseline_rss,
+            'error': None,
+        })
+    except Exception as e:
+        result_queue.put({'error': str(e)})
+
+
+def measure(backend_name, pdf_path, timeout):
+    ctx = multiprocessing.get_context('spawn')
+    result_queue = ctx.Queue()
+    process = ctx.Process(target=_run_single, args=(backend_name, pdf_path, result_queue))
+    process.start()
+    deadline = time.monotonic() + timeout
+    result = None
+    while result is None:
+        try:
+            result = result_queue.get(timeout=1)
+        except queue.Empty:
+            # 결과 없이 종료(세그폴트/OOM 등)했거나 시간 초과면 실패로 기록
+            if process.exitcode is not None:
+                # 종료 직전에 넣은 결과가 아직 파이프에 남아 있을 수 있음
+                try:
+                    result = result_queue.get(timeout=1)
+                except queue.Empty:
+                    result = {'error': f"자식 프로세스 비정상 종료 (exitcode={process.exitcode})"}
+            elif time.monotonic() > deadline:
+                process.terminate()
+                result = {'error': f"{timeout}초 시간 초과"}
+    process.join()
+    return result
+
+
+def run_benchmark(corpus_dir, backends, runs, timeout):
+    pdf_paths = sorted(glob.glob(os.path.join(corpus_dir, '**', '*.pdf'), recursive=True))
+    if not pdf_paths:
+        raise SystemExit(f"PDF 파일이 없습니다: {corpus_dir}")
+    print(f"=== PDF 백엔드 벤치마크 (파일 {len(pdf_paths)}개, 백엔드 {backends}, {runs}회 반복) ===")
+
+    rows = []
+    for backend_name in backends:
+        for pdf_path in pdf_paths:
+            for run in range(1, runs + 1):
+                result = measure(backend_name, pdf_path, timeout)
+                row = {'backend': backend_name, 'file': os.path.basename(pdf_path), 'run': run, **result}
+                rows.append(row)
+                if result['error']:
+                    print(f"[{backend_name}] {row['file']} 실패: {result['error']}")
+                else:
+                    print(f"[{backend_name}] {row['file']} #{run}: {result['pages']}p, "
+                          f"{result['seconds']:.2f}초, {result['chars']}자, peak {result['peak_rss_mb']:.1f}MB")
+    return pd.DataFrame(rows)
+
+
+def summarize(df):
+    ok = df[df['error'].isna()]
+    summary = ok.groupby('backend').agg(
+        files=('file', 'nunique'),
+        pages=('pages', 'sum'),
+        seconds=('seconds', 'sum'),
+        chars=('chars', 'sum'),
+        peak_rss_mb=('peak_rss_mb', 'max'),
+        rss_delta_mb=('rss_delta_mb', 'max'),
+    )
+    summary['pages_per_sec'] = summary['pages'] / summary['seconds']
+    summary['failures'] = df[df['error'].notna()].groupby('backend').size()
+    summary['failures'] = summary['failures'].fillna(0).astype(int)
+    return summary.sort_values('pages_per_sec', ascending=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF 텍스트 추출 백엔드 비교")
+    parser.add_argument('corpus_dir', help="샘플 PDF가 들어있는 디렉토리")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--timeout', type=int, default=300, help="파일 1개 추출 제한 시간 (초)")
+    args = parser.parse_args()
+
+    df = run_benchmark(args.corpus_dir, args.backends, args.runs, args.timeout)
+    summary = summarize(df)
+    print("\n=== 백엔드별 요약 ===")
+    print(summary.to_string(float_format=lambda v: f"{v:.2f}"))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    detail_path = os.path.join(RESULTS_DIR, f"pdf_backends_{timestamp}.csv")
+    summary_path = os.path.join(RESULTS_DIR, f"pdf_backends_summary_{timestamp}.csv")
+    df.to_csv(detail_path, index=False)
+    summary.to_csv(summary_path)
+    print(f"\n결과가 '{detail_path}', '{summary_path}'에 저장되었습니다.")
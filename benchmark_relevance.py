@@ -0,0 +1,241 @@
+"""
+relevance 유사도 계산 방식 비교 벤치마크 (로컬 Redis 필요)
+
+사용법:
+    python benchmark_relevance.py [--papers 200] [--relevant 20] [--batch 5] [--paper-chars 40000]
+                                  [--pooling max topk] [--lsa 64] [--redis-db 15] [--seed 0]
+    python benchmark_relevance.py --throughput [--executors serial process shared]
+                                  [--sweep-papers 5 20 80] [--sweep-chars 10000 40000 160000]
+
+주제별 어휘로 합성 코퍼스를 만든다.
+- 관련 논문: 긴 본문 중 한 구간(약 2청크)에만 회의 주제가 집중됨 (정답)
+- 방해 논문: 회의 주제 단어가 본문 전체에 옅게 흩어져 있음 (오답)
+- 나머지: 다른 주제
+후보 논문을 --batch 개씩 나눠 점수를 매기고 다음을 비교한다.
+- document : 도착 시 저장한 논문 전체 벡터와의 코사인 (score_documents, 현재 기본 방식)
+- chunk-*  : 후보 청크를 한 번에 벡터화해 청크별 코사인을 pooling (score_chunks)
+             relevance_worker는 논문이 도착할 때마다 1편씩 점수를 매기므로 운영 환경의 비용은 --batch 1로 측정한다
+- lsa      : --lsa 차원 수를 주면 합성 코퍼스로 LSA 모델을 임시 디렉토리에 학습해 잠재 공간 코사인도 비교
+지표
+- score ms/batch : 배치 1개 점수 계산 시간 (document는 도착 시 벡터화가 따로 필요하므로 arrival ms/paper도 출력)
+- P@K, nDCG@K    : 회의 1건의 전체 후보 순위 기준 (K = relevance_worker._SELECT_K)
+- R-precision    : 상위 R편(R = 정답 수) 중 정답 비율 (K가 작아 P@K가 포화될 때 비교용)
+- spearman       : document 순위와의 순위 상관
+--throughput 모드는 청크 벡터화 실행 전략(RELEVANCE_EXECUTOR)별로 논문 수 × 본문 길이를 바꿔 가며
+score_chunks 처리량(papers/sec, MB/sec)을 측정한다. 전략마다 1회 워밍업(프로세스 풀 생성) 후 --runs 회 평균.
+코퍼스 IDF 모델이 오염되지 않도록 --redis-db(기본 15)의 별도 DB를 사용하고 끝나면 비운다.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import redis
+from dotenv import load_dotenv
+from scipy.stats import spearmanr
+
+# app 패키지 import 시 필요한 환경변수 로드
+load_dotenv()
+
+from app.services import lsa_model, relevance_model
+from app.workers.relevance_worker import _SELECT_K
+
+# 결과 저장 디렉토리 설정 (benchmark.py와 동일)
+BENCHMARK_DIR = os.path.join(os.path.dirname(__file__), 'benchmark')
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+_TOPICS = 12
+_TOPIC_WORDS = 300
+_COMMON_WORDS = 2000
+_SECTION_CHARS = 4000
+
+
+def _topic_words(topic):
+    return [f"topic{topic}term{j}" for j in range(_TOPIC_WORDS)]
+
+
+def _text(words, chars, rng):
+    """Zipf 분포로 단어를 뽑아 약 chars 길이의 텍스트 생성"""
+    weights = 1 / np.arange(1, len(words) + 1)
+    weights /= weights.sum()
+    out, size = [], 0
+    while size < chars:
+        batch = rng.choice(words, size=256, p=weights)
+        out.extend(batch)
+        size += sum(len(w) + 1 for w in batch)
+    return " ".join(out)[:chars]
+
+
+def build_corpus(n_papers, n_relevant, paper_chars, seed):
+    rng = np.random.default_rng(seed)
+    common = [f"common{j}" for j in range(_COMMON_WORDS)]
+    meeting = _text(_topic_words(0) + common[:200], 6000, rng)
+
+    papers = []
+    n_distractors = n_relevant
+    for p in range(n_papers):
+        topic = int(rng.integers(1, _TOPICS))
+        body = _text(_topic_words(topic) + common, paper_chars, rng)
+        label = 0
+        if p < n_relevant:
+            # 본문의 임의 위치에 회의 주제 구간(약 2청크) 삽입
+            section = _text(_topic_words(0), _SECTION_CHARS, rng)
+            at = int(rng.integers(0, len(body)))
+            body = body[:at] + " " + section + " " + body[at:]
+            label = 1
+        elif p < n_relevant + n_distractors:
+            # 같은 양의 회의 주제 단어를 본문 전체에 흩뿌림
+            words = body.split(" ")
+            for _ in range(_SECTION_CHARS // 24):
+                words.insert(int(rng.integers(0, len(words))), str(rng.choice(_topic_words(0)[:30])))
+            body = " ".join(words)
+        papers.append({'doc_id': f"bench-{seed}-{p}", 'text': body, 'label': label})
+    random.Random(seed).shuffle(papers)
+    return meeting, papers
+
+
+def _ndcg(labels, k):
+    gains = np.asarray(labels[:k], dtype=float)
+    dcg = (gains / np.log2(np.arange(2, len(gains) + 2))).sum()
+    ideal = np.sort(np.asarray(labels, dtype=float))[::-1][:k]
+    idcg = (ideal / np.log2(np.arange(2, len(ideal) + 2))).sum()
+    return dcg / idcg if idcg else 0.0
+
+
+def _quality(papers, scores, k):
+    order = sorted(papers, key=lambda p: scores[p['doc_id']], reverse=True)
+    labels = [p['label'] for p in order]
+    n_relevant = sum(labels)
+    return {
+        'p_at_k': sum(labels[:k]) / k,
+        'ndcg_at_k': _ndcg(labels, k),
+        'r_precision': sum(labels[:n_relevant]) / n_relevant if n_relevant else 0.0,
+    }
+
+
+def run_benchmark(args):
+    meeting, papers = build_corpus(args.papers, args.relevant, args.paper_chars, args.seed)
+    print(f"=== relevance 점수 방식 벤치마크 (논문 {len(papers)}편, 정답 {args.relevant}편, "
+          f"배치 {args.batch}, 본문 {args.paper_chars}자) ===")
+
+    # 도착 시 벡터화 (코퍼스 IDF 갱신 포함) — 두 방식 모두 df를 쓰므로 공통 단계
+    started = time.perf_counter()
+    for paper in papers:
+        relevance_model.add_document(paper['doc_id'], paper['text'])
+    arrival_ms = (time.perf_counter() - started) * 1000 / len(papers)
+    query = relevance_model.query_vector(meeting)
+
+    batches = [papers[i:i + args.batch] for i in range(0, len(papers), args.batch)]
+    methods = {'document': None, **{f"chunk-{pooling}": pooling for pooling in args.pooling}}
+    if args.lsa:
+        lsa_model._MODEL_DIR = tempfile.mkdtemp(prefix="lsa_bench_")
+        lsa_model.train(n_components=args.lsa)
+        methods['lsa'] = 'lsa'
+    all_scores, rows = {}, []
+    for method, pooling in methods.items():
+        scores, elapsed = {}, []
+        for batch in batches:
+            started = time.perf_counter()
+            if pooling is None:
+                scores.update(relevance_model.score_documents(query, [p['doc_id'] for p in batch]))
+            elif pooling == 'lsa':
+                scores.update(lsa_model.score_documents(query, [p['doc_id'] for p in batch]))
+            else:
+                scores.update(relevance_model.score_chunks(
+                    query, {p['doc_id']: p['text'] for p in batch}, pooling=pooling))
+            elapsed.append((time.perf_counter() - started) * 1000)
+        all_scores[method] = scores
+        rows.append({
+            'method': method,
+            'score_ms_per_batch': float(np.mean(elapsed)),
+            'score_ms_p95': float(np.percentile(elapsed, 95)),
+            'arrival_ms_per_paper': arrival_ms,
+            **_quality(papers, scores, _SELECT_K),
+        })
+
+    reference = [all_scores['document'][p['doc_id']] for p in papers]
+    for row in rows:
+        ranked = [all_scores[row['method']][p['doc_id']] for p in papers]
+        row['spearman_vs_document'] = float(spearmanr(reference, ranked).correlation)
+    return pd.DataFrame(rows).set_index('method')
+
+
+def run_throughput(args):
+    print(f"=== 청크 벡터화 실행 전략 처리량 (전략 {args.executors}, 논문 수 {args.sweep_papers}, "
+          f"본문 {args.sweep_chars}자, {args.runs}회 반복) ===")
+    rows = []
+    for chars in args.sweep_chars:
+        meeting, papers = build_corpus(max(args.sweep_papers), max(args.sweep_papers) // 10, chars, args.seed)
+        for paper in papers:
+            relevance_model.add_document(paper['doc_id'], paper['text'])
+        query = relevance_model.query_vector(meeting)
+        for executor in args.executors:
+            relevance_model.score_chunks(query, {p['doc_id']: p['text'] for p in papers[:2]}, executor=executor)
+            for n_papers in args.sweep_papers:
+                texts = {p['doc_id']: p['text'] for p in papers[:n_papers]}
+                started = time.perf_counter()
+                for _ in range(args.runs):
+                    relevance_model.score_chunks(query, texts, executor=executor)
+                seconds = (time.perf_counter() - started) / args.runs
+                rows.append({
+                    'executor': executor,
+                    'papers': n_papers,
+                    'paper_chars': chars,
+                    'seconds': seconds,
+                    'papers_per_sec': n_papers / seconds,
+                    'mb_per_sec': sum(map(len, texts.values())) / seconds / 1e6,
+                })
+                print(f"[{executor}] 논문 {n_papers}편 × {chars}자: {seconds * 1000:.1f}ms, "
+                      f"{n_papers / seconds:.1f} papers/sec")
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="relevance 유사도 계산 방식 비교")
+    parser.add_argument('--papers', type=int, default=200)
+    parser.add_argument('--relevant', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=5)
+    parser.add_argument('--paper-chars', type=int, default=40000)
+    parser.add_argument('--pooling', nargs='+', default=['max', 'topk'], choices=['max', 'topk'])
+    parser.add_argument('--lsa', type=int, default=0, help="LSA 차원 수 (0이면 LSA 비교 생략)")
+    parser.add_argument('--redis-db', type=int, default=15)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--throughput', action='store_true', help="실행 전략별 처리량 측정")
+    parser.add_argument('--executors', nargs='+', default=list(relevance_model._EXECUTORS),
+                        choices=list(relevance_model._EXECUTORS))
+    parser.add_argument('--sweep-papers', nargs='+', type=int, default=[5, 20, 80])
+    parser.add_argument('--sweep-chars', nargs='+', type=int, default=[10000, 40000, 160000])
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+    if not args.throughput and args.relevant * 2 > args.papers:
+        sys.exit("--relevant는 --papers의 절반 이하여야 합니다 (정답 + 방해 논문)")
+
+    relevance_model.redis_client = redis.Redis(host="localhost", port=6379, db=args.redis_db)
+    relevance_model.redis_client.flushdb()
+    try:
+        if args.throughput:
+            summary = run_throughput(args)
+        else:
+            summary = run_benchmark(args)
+    finally:
+        relevance_model.redis_client.flushdb()
+
+    if args.throughput:
+        print("\n=== 실행 전략별 처리량 (papers/sec) ===")
+        print(summary.pivot_table(index=['paper_chars', 'papers'], columns='executor',
+                                  values='papers_per_sec').to_string(float_format=lambda v: f"{v:.1f}"))
+    else:
+        print(f"\n=== 방식별 요약 (K={_SELECT_K}) ===")
+        print(summary.to_string(float_format=lambda v: f"{v:.3f}"))
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    name = "relevance_throughput" if args.throughput else "relevance_scoring"
+    summary_path = os.path.join(RESULTS_DIR, f"{name}_{timestamp}.csv")
+    summary.to_csv(summary_path)
+    print(f"\n결과가 '{summary_path}'에 저장되었습니다.")
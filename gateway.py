@@ -1,5 +1,4 @@
 import uuid
-import itertools
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
 import os
@@ -7,8 +6,11 @@ import os
 # 환경변수 로드
 load_dotenv()
 
-from app.services.llm_service import extract_keywords, translate_to_english
+from app.services import meeting_context
+from app.services.llm_service import analyze_meeting
+from app.services.query_planner import plan_queries
 from app.celery_app import celery_app
+from app.workers.openalex_reduce_worker import register_map_tasks, schedule_reduce
 
 app = Flask(__name__)
 
@@ -18,35 +20,37 @@ def handle_meeting():
     meeting_text = data['content']
     meeting_id = data.get('meetingId')
 
-    # 회의록을 키워드 추출 (Gemini API)
-    ks = extract_keywords(meeting_text)
-    keywords = ks.keywords
+    task_id = str(uuid.uuid4())
 
-    # 회의록을 영어로 번역 (Gemini API) -> 목적 : TF-IDF 코사인 유사도 계산을 위함
-    meeting_text_en = translate_to_english(meeting_text)
+    def start_map_tasks(keywords):
+        """키워드가 나오는 즉시 map 태스크 발행 (요약/번역 생성은 계속 진행)"""
+        # OpenAlex 호출 계획 (키워드 조합별 검색 대신 기본 쿼리를 페이지 단위로 조회)
+        pages = plan_queries(keywords)
+        register_map_tasks(task_id, len(pages))
 
-    # 키워드 조합 생성
-    combos = []
-    for r in range(2, len(keywords)+1):
-        combos.extend(list(itertools.combinations(keywords, r)))
+        # Reduce 예약 (마지막 map 태스크 완료 시 발행, timeout 시 partial reduce)
+        # map 태스크 발행 전에 예약해 두어야 이후 분석/저장이 실패해도 map 결과가 방치되지 않음
+        schedule_reduce(task_id, len(pages), meeting_id)
 
-    # Map 태스크 비동기 발행
-    task_id = str(uuid.uuid4())
-    for combo in combos:
-        celery_app.send_task(
-            'workers.openalex_worker.query_papers',
-            args=[list(combo), task_id]
-        )
-
-    # Reduce 태스크 비동기 발행
-    celery_app.send_task(
-        'workers.openalex_reduce_worker.reduce',
-        args=[task_id, len(combos), meeting_id, meeting_text_en]
-    )
+        # Map 태스크 비동기 발행
+        for page in pages:
+            celery_app.send_task(
+                'workers.openalex_worker.query_planned',
+                args=[keywords, page, task_id]
+            )
+
+    # 회의록 분석 (Gemini API 1회 호출로 키워드, 요약, 영어 번역을 함께 추출, 키워드는 스트리밍 중 먼저 전달)
+    # 번역 목적 : TF-IDF 코사인 유사도 계산을 위함
+    analysis = analyze_meeting(meeting_text, on_keywords=start_map_tasks)
+    keywords = analysis.keywords
+
+    # 번역본의 회의록 벡터를 회의 컨텍스트에 1회 저장 (이후 태스크에는 meeting_id만 전달)
+    # 유사도 계산 방식과 LSA 모델 버전도 이때 회의별로 고정 (RELEVANCE_SCORING/LSA_MODEL_DIR은 워커와 같은 값 사용)
+    meeting_context.save(meeting_id, analysis.translation)
 
     response = {
         'meetingId': meeting_id,
-        'summary': ks.summary,
+        'summary': analysis.summary,
         'keywords': keywords
     }
     return jsonify(response)
@@ -0,0 +1,175 @@
+"""
+relevance 선정 동시성 스트레스 테스트 (로컬 Redis 필요)
+
+사용법:
+    python stress_relevance_claims.py [--workers 4] [--mode process] [--meetings 5] [--papers 20]
+                                      [--duplicates 3] [--fail-rate 0.1]
+
+relevance 워커 -c 4 환경을 흉내 내어 여러 프로세스(또는 스레드)가 같은 회의의 score_paper를 동시에 실행한다.
+- 각 논문을 --duplicates 번씩 섞어서 전달 (pdf_worker 재시도/중복 발행 상황)
+- --fail-rate 확률로 llm_worker 발행을 실패시켜 재시도(autoretry)와 후보 되돌리기 경로를 확인
+- 마지막에 예약된 마감 선정(flush_selection)을 예약 순서대로 실행 (실행 중 새로 예약되면 그것도 실행)
+실제 브로커 대신 send_task를 가로채 발행된 요약/마감 선정 태스크를 Redis 리스트에 기록한다.
+한 번의 선정이 회의의 모든 후보를 꺼내도록 _SELECT_K를 회의당 논문 수로 올리므로,
+같은 논문이 두 번 이상 요약 발행되거나 요약되지 않고 후보로 남은 논문이 있으면 실패로 종료한다.
+"""
+import argparse
+import multiprocessing
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from dotenv import load_dotenv
+
+# app 패키지 import 시 필요한 환경변수 로드
+load_dotenv()
+
+from app.celery_app import celery_app
+from app.services import meeting_context, relevance_model
+from app.services.document_store import document_store
+from app.workers import relevance_worker
+
+_WORDS = (
+    "graph neural network optimization consensus raft leader election database index query "
+    "planner vision transformer attention retrieval embedding cluster replication latency"
+).split()
+
+
+def _install_recorder(run_id, fail_rate):
+    """send_task를 가로채 요약/역색인 발행을 Redis에 기록 (fail_rate 확률로 요약 발행 실패)"""
+    client = relevance_worker.redis_client
+
+    def send_task(name, args=None, kwargs=None, **options):
+        if name == 'workers.llm_worker.summarize_paper':
+            if random.random() < fail_rate:
+                raise ConnectionError("브로커 발행 실패 (주입)")
+            title, meeting_id = args[0], args[1]
+            client.rpush(f"stress:{run_id}:summaries", f"{meeting_id}\t{title}")
+        elif name == 'workers.invertedindex_worker.build_inverted_index':
+            client.incr(f"stress:{run_id}:index_jobs")
+        elif name == 'workers.relevance_worker.flush_selection':
+            # 예약만 기록하고 마지막에 직접 실행
+            client.rpush(f"stress:{run_id}:flushes", args[0])
+
+    celery_app.send_task = send_task
+
+
+def _deliver(task, args):
+    """celery autoretry(max_retries=1)와 같은 재시도 동작"""
+    for attempt in range(2):
+        try:
+            return task.run(*args)
+        except ConnectionError:
+            if attempt == 1:
+                raise
+
+
+def _worker(run_id, deliveries, fail_rate, seed):
+    random.seed(seed)
+    _install_recorder(run_id, fail_rate)
+    failed = 0
+    for meeting_id, paper in deliveries:
+        try:
+            _deliver(relevance_worker.score_paper, (meeting_id, paper))
+        except ConnectionError:
+            failed += 1
+    return failed
+
+
+def _worker_entry(args):
+    return _worker(*args)
+
+
+def prepare(run_id, meetings, papers):
+    """회의 컨텍스트와 회의별 논문 본문(문서 저장소/IDF 모델)을 등록하고 전달 목록 생성"""
+    deliveries = []
+    for m in range(meetings):
+        meeting_id = f"stress-{run_id}-{m}"
+        meeting_context.save(meeting_id, " ".join(random.sample(_WORDS, 6)))
+        for p in range(papers):
+            text = " ".join(random.choice(_WORDS) for _ in range(400)) + f" paper{m}x{p}"
+            doc_id = document_store.put(text)
+            relevance_model.add_document(doc_id, text)
+            paper = {'title': f"paper {m}-{p}", 'doc_id': doc_id, 'meeting_id': meeting_id, 'pdf_url': ''}
+            deliveries.append((meeting_id, paper))
+    return deliveries
+
+
+def run(args):
+    run_id = uuid.uuid4().hex[:8]
+    # 선정 1회가 남은 후보를 모두 꺼내므로, 되돌린 후보가 다시 선정되지 않으면 후보로 남아 드러남
+    relevance_worker._SELECT_K = args.papers
+    deliveries = prepare(run_id, args.meetings, args.papers) * args.duplicates
+    random.shuffle(deliveries)
+    shards = [deliveries[i::args.workers] for i in range(args.workers)]
+    jobs = [(run_id, shard, args.fail_rate, i) for i, shard in enumerate(shards)]
+    print(f"=== relevance 선정 스트레스 (run {run_id}, 전달 {len(deliveries)}건, {args.mode} × {args.workers}) ===")
+
+    started = time.perf_counter()
+    if args.mode == 'process':
+        with multiprocessing.get_context('fork').Pool(args.workers) as pool:
+            failed = sum(pool.map(_worker_entry, jobs))
+    else:
+        results = [0] * args.workers
+
+        def target(i):
+            results[i] = _worker(*jobs[i])
+
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(args.workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        failed = sum(results)
+    elapsed = time.perf_counter() - started
+
+    # 예약된 마감 선정 실행 (countdown이 지난 것으로 간주)
+    _install_recorder(run_id, 0.0)
+    client = relevance_worker.redis_client
+    flushes = 0
+    while True:
+        meeting_id = client.lpop(f"stress:{run_id}:flushes")
+        if meeting_id is None:
+            break
+        relevance_worker.flush_selection.run(meeting_id.decode())
+        flushes += 1
+    stranded = {
+        f"stress-{run_id}-{m}": client.zcard(f"relevance:stress-{run_id}-{m}:candidates")
+        for m in range(args.meetings)
+    }
+    stranded = {meeting_id: n for meeting_id, n in stranded.items() if n}
+
+    summaries = [s.decode() for s in client.lrange(f"stress:{run_id}:summaries", 0, -1)]
+    counts = Counter(summaries)
+    duplicates = {key: n for key, n in counts.items() if n > 1}
+    expected = args.meetings * args.papers
+    print(f"score_paper 실행: {len(deliveries)}건, {elapsed:.2f}초 (재시도 후 최종 실패 {failed}건)")
+    print(f"요약 발행: {len(summaries)}건 / 논문 {expected}편, 역색인 발행 {int(client.get(f'stress:{run_id}:index_jobs') or 0)}건, "
+          f"마감 선정 {flushes}회")
+
+    client.delete(f"stress:{run_id}:summaries", f"stress:{run_id}:index_jobs", f"stress:{run_id}:flushes")
+    if duplicates:
+        print(f"실패: 중복 요약 {len(duplicates)}건 → {list(duplicates.items())[:5]}")
+        return 1
+    if stranded:
+        print(f"실패: 선정되지 않고 남은 후보 → {stranded}")
+        return 1
+    if failed == 0 and len(summaries) != expected:
+        print(f"실패: 누락된 논문 {expected - len(summaries)}편")
+        return 1
+    print("성공: 중복 요약 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="relevance 선정 동시성 스트레스 테스트")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--mode', choices=['process', 'thread'], default='process')
+    parser.add_argument('--meetings', type=int, default=5)
+    parser.add_argument('--papers', type=int, default=20)
+    parser.add_argument('--duplicates', type=int, default=3)
+    parser.add_argument('--fail-rate', type=float, default=0.1)
+    sys.exit(run(parser.parse_args()))
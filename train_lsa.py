@@ -0,0 +1,35 @@
+"""
+relevance LSA 모델 오프라인 학습 (로컬 Redis 필요, GPU/네트워크 불필요)
+
+사용법:
+    python train_lsa.py [--components 256] [--min-df 2]
+
+relevance_model 코퍼스(tfidf:docs)에 반영된 논문 중 TF-IDF 벡터가 남아 있는 논문으로 TruncatedSVD를 학습해
+LSA_MODEL_DIR에 새 버전을 저장하고 오래된 버전을 정리한다(LSA_KEEP_VERSIONS, LSA_KEEP_SECONDS).
+RELEVANCE_SCORING=lsa이면 1분 이내에 시작하는 회의부터 새 버전을 쓰고, 진행 중인 회의는 시작할 때 고정한 버전을 계속 쓴다.
+논문 벡터는 RELEVANCE_VECTOR_TTL 뒤 만료되므로, 코퍼스가 쌓이는 동안 주기적으로(cron 등) 실행한다.
+"""
+import argparse
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+# app 패키지 import 시 필요한 환경변수 로드
+load_dotenv()
+
+from app.services import lsa_model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="relevance LSA 모델 학습")
+    parser.add_argument('--components', type=int, default=lsa_model._N_COMPONENTS)
+    parser.add_argument('--min-df', type=int, default=lsa_model._MIN_DF)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        version = lsa_model.train(n_components=args.components, min_df=args.min_df)
+    except ValueError as e:
+        print(f"학습 실패: {e}")
+        sys.exit(1)
+    print(f"학습 완료: {lsa_model._MODEL_DIR}/{version}")